@@ -11,6 +11,7 @@ from utils.database.main_controller import Main_DB_Controller
 from utils.interaction_handler.button import Button_Interaction_Handler
 from utils.interaction_handler.role_select import RoleSelect_Interaction_Handler
 from utils.interaction_handler.custom_select import Select_Interaction_Handler
+from utils.user_resolver import User_Name_Resolver
 
 class Apollo_Bot(commands.Bot):
     def __init__(self, base_path:Path, startup_time:float, program_version:str):
@@ -24,7 +25,8 @@ class Apollo_Bot(commands.Bot):
         self.__first_on_ready = False
         self.__base_path = base_path
         self.__startup_time = startup_time
-        self.__database:PostgreSQL_Adapter
+        self.__database:Main_DB_Controller = None
+        self.__user_resolver = User_Name_Resolver(self)
 
     async def hybrid_get_user(self, user_id:int) -> discord.User | None:
         """Returns a user with the given ID
@@ -38,7 +40,7 @@ class Apollo_Bot(commands.Bot):
     async def setup_hook(self):
         # Register cogs to handle commands
         for cog_name in ["reload", "economy.currency", "economy.leaderboard", "economy.dailymoney", "economy.give", "gamble.group", "economy.pick", "economy.plant", 
-                         "leveling.rank", "leveling.ranks", "setup.group", "leveling.turntoxp", "event.message.group", "leveling.group"]:
+                         "leveling.rank", "leveling.ranks", "setup.group", "leveling.turntoxp", "event.message.group", "leveling.group", "statistics"]:
             await self.load_extension(f"cogs.{cog_name}")
         await self.tree.sync()
 
@@ -84,16 +86,41 @@ class Apollo_Bot(commands.Bot):
             await self.change_presence(status = discord.Status.dnd, activity = discord.CustomActivity("Executing pre startup routine (1/2)"))
 
             try:
-                # Create the database connection
+                # Create the database connection, with one pool per class of workload (minimum and maximum number of connections)
+                pool_sizes = {
+                    pool_name: tuple(int(size) for size in sizes.split(","))
+                    for pool_name, sizes in database_config["POOL_SIZES"].items()
+                }
                 psql_adapter = await PostgreSQL_Adapter.create_adapter(
                     database_config["POSTGRESQL"]["USERNAME"],
                     database_config["POSTGRESQL"]["PASSWORD"],
                     database_config["POSTGRESQL"]["DATABASE"],
                     database_config["POSTGRESQL"]["ADRESS"],
                     Path.joinpath(self.__base_path, "src"),
-                    int(database_config["POSTGRESQL"]["PORT"])
+                    int(database_config["POSTGRESQL"]["PORT"]),
+                    pool_sizes
                 )
+                await psql_adapter.create_routines()
+                # Created after the routines, as its triggers depend on them
+                await psql_adapter.check_tables(["guild_member_count"])
+                # Created on every start, as the tables of existing databases do not get the indexes added to their definition later
+                await psql_adapter.create_indexes()
                 controller = Main_DB_Controller(psql_adapter)
+                await controller.preload_channel_settings()
+                if database_config.getboolean("EXPERIENCE_BUFFER", "ENABLED"):
+                    controller.enable_experience_buffer(
+                        float(database_config["EXPERIENCE_BUFFER"]["FLUSH_INTERVAL"]),
+                        int(database_config["EXPERIENCE_BUFFER"]["FLUSH_ENTRIES"])
+                    )
+                if database_config.getboolean("CHANNEL_SETTINGS", "REFRESH"):
+                    # The channel tables are also edited outside of the bot, the cached settings would miss those changes otherwise
+                    controller.enable_channel_settings_refresh(float(database_config["CHANNEL_SETTINGS"]["REFRESH_INTERVAL"]))
+                if database_config.getboolean("DEGRADED_MODE", "ENABLED"):
+                    controller.enable_load_monitor(
+                        float(database_config["DEGRADED_MODE"]["QUERY_LATENCY"]),
+                        float(database_config["DEGRADED_MODE"]["ACQUIRE_WAIT"]),
+                        float(database_config["DEGRADED_MODE"]["RECOVERY_TIME"])
+                    )
                 self.__database = controller
                 await self.change_presence(status = discord.Status.online, activity = None)
             except Exception as error:
@@ -110,7 +137,29 @@ class Apollo_Bot(commands.Bot):
     async def on_message(self, message):
         pass
 
+    async def close(self):
+        # Write the experience still held in memory, before the connection is gone
+        try:
+            if self.__database is not None:
+                self.__database.stop_load_monitor()
+                self.__database.stop_channel_settings_refresh()
+                await self.__database.stop_experience_buffer()
+                self.__database.log_statistics()
+        finally:
+            # The bot is closed even if the experience could not be written
+            await super().close()
+
+    @property
+    def base_path(self) -> Path:
+        """Path to the root of the project, containing the "config" and "src" folder"""
+        return self.__base_path
+
     @property
     def database(self) -> PostgreSQL_Adapter:
         """Main_DB_Controller wich handles every request to the database for this bot"""
         return self.__database
+
+    @property
+    def user_resolver(self) -> User_Name_Resolver:
+        """Resolves and caches the names of users, shared by all cogs"""
+        return self.__user_resolver
@@ -15,28 +15,15 @@ class Give_Command(Base_Cog):
     @app_commands.describe(amount = "Amount of balance you want to gift")
     async def give(self, ctx: discord.Interaction, member: discord.Member, amount: int):
         database:Main_DB_Controller = ctx.client.database
-        # Get balance of current user
-        user_balance = await database.get_user_currency(ctx.guild_id, ctx.user.id)
-        
-        # Check for sufficient balance
-        if user_balance is None:
-            embed = discord.Embed(
-                description = "You do not have an account balance yet\nCollect your dailymoney or get gifted some",
-                color = 0xDB3F2F
-            )
-            await ctx.response.send_message(embed = embed)
-            return
-        if user_balance < amount:
+        # Check for great enougth amount
+        if amount <= 0:
             embed = discord.Embed(
-                description = (
-                    "Your credit is not sufficient\n"
-                    f"You are trying to give away `{amount}` :dollar: to <@{member.id}>, but you only have `{user_balance}` :dollar:"
-                ),
+                description = "You cannot give less than `1` :dollar:",
                 color = 0xDB3F2F
             )
             await ctx.response.send_message(embed = embed)
             return
-        
+
         # Check if source and target user are the same
         if ctx.user.id == member.id:
             embed = discord.Embed(
@@ -46,14 +33,35 @@ class Give_Command(Base_Cog):
             await ctx.response.send_message(embed = embed)
             return
         
-        # Transfer the money to another user
-        await database.substract_from_user_balance(ctx.guild_id, ctx.user.id, amount)
-        await database.add_to_user_balance(ctx.guild_id, member.id, amount)
+        # Transfer the money to another user, both changes are applied together or not at all
+        async with database.transaction():
+            remaining_balance = await database.try_debit(ctx.guild_id, ctx.user.id, amount)
+            if remaining_balance is not None:
+                await database.add_to_user_balance(ctx.guild_id, member.id, amount)
+
+        # Check for sufficient balance
+        if remaining_balance is None:
+            user_balance = await database.get_user_currency(ctx.guild_id, ctx.user.id)
+            if user_balance is None:
+                embed = discord.Embed(
+                    description = "You do not have an account balance yet\nCollect your dailymoney or get gifted some",
+                    color = 0xDB3F2F
+                )
+            else:
+                embed = discord.Embed(
+                    description = (
+                        "Your credit is not sufficient\n"
+                        f"You are trying to give away `{amount}` :dollar: to <@{member.id}>, but you only have `{user_balance}` :dollar:"
+                    ),
+                    color = 0xDB3F2F
+                )
+            await ctx.response.send_message(embed = embed)
+            return
 
         embed = discord.Embed(
             description = (
                 f"Successfully transferred `{amount}` :dollar: to <@{member.id}>\n"
-                f"Your remaining balance is `{user_balance - amount}` :dollar:"
+                f"Your remaining balance is `{remaining_balance}` :dollar:"
             ),
             color = 0x4BB543
         )
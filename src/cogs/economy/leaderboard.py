@@ -4,59 +4,73 @@ from discord.ext import commands
 import logging
 from cogs.base_cog import Base_Cog
 import math
+import asyncpg
 from utils.database.main_controller import Main_DB_Controller
 from utils.interaction_handler.button import Button_Interaction_Handler
-
-from datetime import datetime
-from utils.datetime_tools import get_elapsed_time_milliseconds
+from utils.page_cache import Page_Prefetcher, Rendered_Page_Cache
 
 class Leaderboard_Command(Base_Cog):
     def __init__(self, bot):
         self.__bot:commands.Bot = bot
+        # Rendered pages, invalidated whenever a balance on the guild changes
+        self.__page_cache = Rendered_Page_Cache()
+        self.__prefetcher = Page_Prefetcher()
         super().__init__(logging.getLogger("cmds.maintenance"))
 
-    async def get_number_of_leaderboard_pages(self, guild_id:int, page_size:int = 9) -> int:
-        """Returns the number of pages that can be displayed for an leaderboard, for an certain guild"""
+    async def get_number_of_leaderboard_pages(self, guild_id:int, page_size:int = 9) -> int | None:
+        """Returns the number of pages that can be displayed for an leaderboard, for an certain guild
+
+        While the database is overloaded only a cached number is returned, None if there is none"""
         database:Main_DB_Controller = self.__bot.database
-        return math.ceil(await database.get_number_of_users(guild_id) / page_size)
+        version = database.get_balance_version(guild_id)
+        number_of_pages = self.__page_cache.get(guild_id, ("pages", page_size), version, allow_outdated = database.degraded)
+        if number_of_pages is None:
+            if database.degraded:
+                return None
+            number_of_pages = math.ceil(await database.get_number_of_users(guild_id) / page_size)
+            self.__page_cache.put(guild_id, ("pages", page_size), version, number_of_pages)
+        return number_of_pages
     
-    async def get_next_page(self, message_id:int, increment:bool = True) -> int:
-        """Returns the true (first page is `0`) id of the next page
+    async def get_page_users(self, guild_id:int, current_page:int, cursor:tuple[int, int] | None = None, backwards:bool = False) -> list[asyncpg.Record]:
+        """Returns the users displayed on the page (first page is `0`)
         
-        When `increment` is `False`, it will be counted downwards, but never below zero"""
+        If a cursor of the adjacent page is provided, the users are seeked from it, instead of skipping all previous rows"""
         database:Main_DB_Controller = self.__bot.database
-        current_page = await database.get_leaderboard_page(message_id)
-        if increment:
-            current_page = current_page + 1
-        else:
-            current_page = current_page - 1
-            if current_page < 0:
-                current_page = 0
-
-        return current_page
+        if current_page == 0 or cursor is None:
+            return await database.get_leaderboard_page_users(guild_id, current_page * 9)
+        return await database.seek_leaderboard_page_users(guild_id, cursor, backwards = backwards)
     
-    def create_button_view(self, current_page:int, number_of_pages:int) -> discord.ui.View:
-        """Creates a new view with two buttons to interact with the current view"""
+    @staticmethod
+    def get_page_cursors(users:list[asyncpg.Record]) -> tuple[tuple[int, int] | None, tuple[int, int] | None]:
+        """Returns the `(balance, user_id)` cursors of the first and last user on the page"""
+        if not users:
+            return None, None
+        return (users[0]["balance"], users[0]["user_id"]), (users[-1]["balance"], users[-1]["user_id"])
+    
+    def create_button_view(self, current_page:int, number_of_pages:int, users:list[asyncpg.Record]) -> discord.ui.View:
+        """Creates a new view with two buttons to interact with the current view
+        
+        The target page and the cursor to seek it from are encoded into the custom_id of the buttons, no state is stored in the database"""
+        first_cursor, last_cursor = self.get_page_cursors(users)
+        previous_id = Button_Interaction_Handler.build_custom_id("econ.lb.prev", current_page - 1, *(first_cursor or ()))
+        next_id = Button_Interaction_Handler.build_custom_id("econ.lb.next", current_page + 1, *(last_cursor or ()))
+
         view = discord.ui.View()
-        view.add_item(discord.ui.Button(style = discord.ButtonStyle.blurple, label = "Previous", custom_id = "econ.lb.prev", disabled = True if current_page == 0 else False))
-        view.add_item(discord.ui.Button(style = discord.ButtonStyle.blurple, label = "Next", custom_id = "econ.lb.next", disabled = True if current_page == number_of_pages else False))
+        view.add_item(discord.ui.Button(style = discord.ButtonStyle.blurple, label = "Previous", custom_id = previous_id, disabled = True if current_page == 0 else False))
+        view.add_item(discord.ui.Button(style = discord.ButtonStyle.blurple, label = "Next", custom_id = next_id, disabled = True if current_page >= number_of_pages - 1 else False))
         return view
     
-    async def create_embed(self, guild_id:int, current_page:int, number_of_pages:int) -> discord.Embed:
+    async def create_embed(self, users:list[asyncpg.Record], current_page:int, number_of_pages:int) -> discord.Embed:
         """Create a new embed, to display the users on the current page aswell as thier currency"""
-        database:Main_DB_Controller = self.__bot.database
-        users = await database.get_leaderboard_page_users(guild_id, current_page * 9)
         placement = current_page * 9
 
         embed = discord.Embed(
             title = "Leaderbaord :dollar:",
             color = 0x4184BC)
+        user_names = await self.__bot.user_resolver.resolve_names([user["user_id"] for user in users])
         for user in users:
-            begin = datetime.now().timestamp()
-            discord_user = await self.__bot.hybrid_get_user(user['user_id'])
-            print(get_elapsed_time_milliseconds(datetime.now().timestamp() - begin))
             embed.add_field(
-                name = f"#{placement + 1} {discord_user.name}",
+                name = f"#{placement + 1} {user_names[user['user_id']]}",
                 value = f"`{user['balance']}` :dollar:",
                 inline = True
             )
@@ -65,11 +79,51 @@ class Leaderboard_Command(Base_Cog):
 
         return embed
 
+    @staticmethod
+    def create_busy_embed() -> discord.Embed:
+        """Creates the embed shown instead of a page, that could not be rendered because the database is overloaded"""
+        return discord.Embed(
+            description = "The bot is very busy right now, please try again in a moment",
+            color = 0xDB3F2F)
+
+    async def render_page(self, guild_id:int, current_page:int, number_of_pages:int, cursor:tuple[int, int] | None = None, backwards:bool = False) -> tuple[discord.Embed, list[asyncpg.Record]] | None:
+        """Returns the embed and the users of the page, taken from the cache if no balance on the guild has changed since it was rendered
+
+        While the database is overloaded only a cached page is returned, None if there is none"""
+        async def render() -> tuple[discord.Embed, list[asyncpg.Record]]:
+            users = await self.get_page_users(guild_id, current_page, cursor, backwards)
+            embed = await self.create_embed(users, current_page, number_of_pages)
+            hits, misses, hit_rate = self.__page_cache.get_statistics()
+            self._logger.debug(f"Rendered leaderboard page {current_page} of guild {guild_id} (page cache: {hits} hits, {misses} misses, {hit_rate:.0%} hit rate)")
+            return embed, users
+
+        database:Main_DB_Controller = self.__bot.database
+        version = database.get_balance_version(guild_id)
+        if database.degraded:
+            # Only answer from the cache while the database is overloaded, even if the page is outdated
+            return self.__page_cache.get(guild_id, (current_page, number_of_pages), version, allow_outdated = True)
+        return await self.__page_cache.get_or_render(guild_id, (current_page, number_of_pages), version, render)
+
+    def prefetch_adjacent_pages(self, message_id:int, guild_id:int, current_page:int, number_of_pages:int, users:list[asyncpg.Record]):
+        """Renders the next and previous page in the background, seeking them from the cursors of the page shown"""
+        database:Main_DB_Controller = self.__bot.database
+        if database.degraded:
+            return
+        first_cursor, last_cursor = self.get_page_cursors(users)
+        renders = []
+        if current_page < number_of_pages - 1:
+            renders.append(lambda: self.render_page(guild_id, current_page + 1, number_of_pages, last_cursor, False))
+        if current_page > 0:
+            renders.append(lambda: self.render_page(guild_id, current_page - 1, number_of_pages, first_cursor, True))
+        self.__prefetcher.schedule(message_id, renders)
+
     @app_commands.command(name = "leaderboard", description = "Displays the leaderboard, for the users with the most currency on the server")
     @app_commands.describe(current_page = "Display an certain page of the leaderboard")
     async def show_leaderboard(self, ctx: discord.Interaction, current_page:int = 0):
-        database:Main_DB_Controller = self.__bot.database
         no_of_pages = await self.get_number_of_leaderboard_pages(ctx.guild_id)
+        if no_of_pages is None:
+            await ctx.response.send_message(embed = self.create_busy_embed(), ephemeral = True)
+            return
 
         if current_page > no_of_pages:
             embed = discord.Embed(
@@ -84,33 +138,43 @@ class Leaderboard_Command(Base_Cog):
         else:
             current_page_offset = current_page - 1
         
-        embed = await self.create_embed(ctx.guild_id, current_page_offset, no_of_pages)
-        await ctx.followup.send(embed = embed, view = self.create_button_view(current_page_offset, no_of_pages))
-        
+        page = await self.render_page(ctx.guild_id, current_page_offset, no_of_pages)
+        if page is None:
+            await ctx.followup.send(embed = self.create_busy_embed(), ephemeral = True)
+            return
+        embed, users = page
+        await ctx.followup.send(embed = embed, view = self.create_button_view(current_page_offset, no_of_pages, users))
+        # Grouped by the message, like the prefetches of the page turns, so the first turn cancels these
         message = await ctx.original_response()
-        await database.create_leaderboard_page(message.id, current_page_offset)
+        self.prefetch_adjacent_pages(message.id, ctx.guild_id, current_page_offset, no_of_pages, users)
 
-    #@Button_Interaction_Handler.link_button_callback("econ.lb.prev")
-    async def previous_button_callback(self, ctx: discord.Interaction):
-        database:Main_DB_Controller = self.__bot.database
+    async def turn_page(self, ctx: discord.Interaction, backwards:bool, page:str = None, *cursor:str):
+        """Shows the page encoded in the custom_id of the pressed button, seeking it from the encoded cursor"""
+        if page is None:
+            # Views created before the page has been encoded into the custom_id
+            embed = discord.Embed(
+                description = "This leaderboard has expired, please use the `/leaderboard` command again",
+                color = 0xDB3F2F)
+            await ctx.response.send_message(embed = embed, ephemeral = True)
+            return
 
-        current_page = await self.get_next_page(ctx.message.id, False)
+        current_page = max(int(page), 0)
         no_of_pages = await self.get_number_of_leaderboard_pages(ctx.guild_id)
+        page = None if no_of_pages is None else await self.render_page(ctx.guild_id, current_page, no_of_pages, tuple(int(value) for value in cursor) or None, backwards)
+        if page is None:
+            await ctx.response.send_message(embed = self.create_busy_embed(), ephemeral = True)
+            return
+        embed, users = page
+        await ctx.response.edit_message(embed = embed, view = self.create_button_view(current_page, no_of_pages, users))
+        self.prefetch_adjacent_pages(ctx.message.id, ctx.guild_id, current_page, no_of_pages, users)
 
-        embed = await self.create_embed(ctx.guild_id, current_page, no_of_pages)
-        await ctx.response.edit_message(embed = embed, view = self.create_button_view(current_page, no_of_pages))
-        await database.update_leaderboard_page(ctx.message.id, current_page)
+    #@Button_Interaction_Handler.link_button_callback("econ.lb.prev")
+    async def previous_button_callback(self, ctx: discord.Interaction, *parameters:str):
+        await self.turn_page(ctx, True, *parameters)
 
     #@Button_Interaction_Handler.link_button_callback("econ.lb.next")
-    async def next_button_callback(self, ctx: discord.Interaction):
-        database:Main_DB_Controller = self.__bot.database
-
-        current_page = await self.get_next_page(ctx.message.id, True)
-        no_of_pages = await self.get_number_of_leaderboard_pages(ctx.guild_id)
-
-        embed = await self.create_embed(ctx.guild_id, current_page, no_of_pages)
-        await ctx.response.edit_message(embed = embed, view = self.create_button_view(current_page + 1, no_of_pages))
-        await database.update_leaderboard_page(ctx.message.id, current_page)
+    async def next_button_callback(self, ctx: discord.Interaction, *parameters:str):
+        await self.turn_page(ctx, False, *parameters)
 
     async def cog_load(self):
         Button_Interaction_Handler.link_button_callback("econ.lb.prev", instance=self)(self.previous_button_callback)
@@ -120,6 +184,7 @@ class Leaderboard_Command(Base_Cog):
     async def cog_unload(self):
         Button_Interaction_Handler.unlink_button_callback("econ.lb.prev")
         Button_Interaction_Handler.unlink_button_callback("econ.lb.next")
+        self.__prefetcher.cancel_all()
         return await super().cog_unload()
 
 async def setup(bot: commands.Bot):
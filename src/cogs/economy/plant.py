@@ -24,30 +24,34 @@ class Plant_Command(Base_Cog):
             await ctx.response.send_message(embed = embed, ephemeral = True)
             return
 
-        # Check for sufficient balance of user
+        # Substract from users balance, only if it is sufficient
         database:Main_DB_Controller = ctx.client.database
-        user_balance = await database.get_user_currency(ctx.guild_id, ctx.user.id)
-        if amount > user_balance:
+        if await database.try_debit(ctx.guild_id, ctx.user.id, amount) is None:
+            user_balance = await database.get_user_currency(ctx.guild_id, ctx.user.id)
             embed = discord.Embed(
-                description = f"You try to plant `{amount}` :dollar:, but only have `{user_balance}` :dollar:",
+                description = f"You try to plant `{amount}` :dollar:, but only have `{user_balance or 0}` :dollar:",
                 color = 0xDB3F2F
             )
             await ctx.response.send_message(embed = embed, ephemeral = True)
             return
         
         # Create and send the plant message
-        file_path = Path(self.__portal.source_path) / "assets" / "img1.jpg"
-        attatchment_image = discord.File(file_path)
-        await ctx.response.send_message(
-            content = f"<@{ctx.user.id}> planted `{amount}` :dollar:, collect them by typing `/pick`, quick!",
-            file = attatchment_image
-        )
-
-        # Substract from users balance and create db entry
-        message = await ctx.original_response()
-        await database.substract_from_user_balance(ctx.guild_id, ctx.user.id, amount)
-        await database.create_pick_message(ctx.guild_id, ctx.channel_id, message.id, amount)
+        try:
+            file_path = Path.joinpath(self.__bot.base_path, "src", "assets", "img1.jpg")
+            attatchment_image = discord.File(file_path)
+            await ctx.response.send_message(
+                content = f"<@{ctx.user.id}> planted `{amount}` :dollar:, collect them by typing `/pick`, quick!",
+                file = attatchment_image
+            )
 
+            # Create db entry
+            message = await ctx.original_response()
+            await database.create_pick_message(ctx.guild_id, ctx.channel_id, message.id, amount)
+        except Exception:
+            # The money has not been planted, so it is given back instead of being lost
+            await database.add_to_user_balance(ctx.guild_id, ctx.user.id, amount)
+            self._logger.warning(f"Planting {amount} for {ctx.user.name} ({ctx.user.id}) failed, the amount has been credited back")
+            raise
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Plant_Command(bot))
\ No newline at end of file
@@ -1,3 +1,4 @@
+import asyncio
 import discord
 from discord import app_commands
 from discord.ext import commands
@@ -5,19 +6,54 @@ import logging
 from cogs.base_cog import Base_Cog
 from utils.database.main_controller import Main_DB_Controller
 from datetime import datetime
+from pathlib import Path
+from typing import Awaitable, Callable
+from utils.adv_configparser import Advanced_ConfigParser
 from utils.datetime_tools import get_elapsed_time_milliseconds
+from utils.work_queue import Fair_Work_Queue
 from cogs.event.message.impls.experience_impl import Experience_Impl
 from cogs.event.message.impls.pick_money_impl import PickMoney_Impl
 import traceback
 
 class Message_Events(Base_Cog):
+    # Seconds the features may take to handle a single message, before the ones still running are cancelled
+    MESSAGE_DEADLINE = 10.0
+
     def __init__(self, bot:commands.Bot):
-        self.__experience:Experience_Impl = None
-        self.__pick_money:PickMoney_Impl = None
+        # Indexed by the name of the feature, holding the index of its functionality (as returned by `get_channel_functionality`),
+        # its handler and the check whether handling a message would be of low value
+        self.__features:dict[str, tuple[int, Callable[[discord.Message], Awaitable], Callable[[discord.Message], bool] | None]] = {}
+        self.__queue:Fair_Work_Queue = None
 
         self.__bot = bot
         super().__init__(logging.getLogger("evnt.msg"))
 
+    def register_feature(self, name:str, functionality_index:int, handler:Callable[[discord.Message], Awaitable], is_low_value:Callable[[discord.Message], bool] = None):
+        """Registers the handler of a message feature, it is called for every message in a channel with the functionality at `functionality_index` enabled
+
+        If all features of a message consider it of low value (`is_low_value`), it is dropped first when the queue is full"""
+        self.__features[name] = (functionality_index, handler, is_low_value)
+
+    def unregister_feature(self, name:str):
+        """Removes the handler of a message feature"""
+        self.__features.pop(name, None)
+
+    async def __run_feature(self, name:str, handler:Callable[[discord.Message], Awaitable], msg:discord.Message, latencies:dict[str, float]):
+        begin_feature = datetime.now().timestamp()
+        try:
+            await handler(msg)
+        except Exception as error:
+            # An error only affects the feature it occured in, the other features still handle the message
+            self._logger.error(f"Feature {name} failed to handle the message {msg.id} ({error.__class__.__name__}: {error})")
+            traceback.print_exception(type(error), error, error.__traceback__)
+        finally:
+            latencies[name] = datetime.now().timestamp() - begin_feature
+
+    @property
+    def queue(self) -> Fair_Work_Queue:
+        """Queue of the messages waiting to be handled, exposing its depth, waiting times and drop counters"""
+        return self.__queue
+
     @commands.Cog.listener()
     async def on_message(self, msg:discord.Message):
         try:
@@ -29,34 +65,81 @@ class Message_Events(Base_Cog):
             elif msg.author.id == self.__bot.user.id:
                 return
 
+            # All message features are background work, they are paused while the database is overloaded
+            database:Main_DB_Controller = self.__bot.database
+            if database.degraded:
+                return
+
             # Check what kind of functionality is enabled for that channel
-            database:Main_DB_Controller = ctx.client.database
             functionality = await database.get_channel_functionality(msg.channel.id)
-        
-            if functionality:
-                if functionality[0]: # Experience
-                    await self.__experience.handle(msg)
+            enabled_features = [
+                (name, handler, is_low_value) for name, (functionality_index, handler, is_low_value) in self.__features.items()
+                if functionality and functionality_index < len(functionality) and functionality[functionality_index]
+            ]
+            if not enabled_features:
+                self._logger.debug(f"No functionalities for {msg.channel.name} ({msg.channel.id}) defined")
+                return
 
-                if functionality[1]: # Pick money
-                    await self.__pick_money.handle(msg)
+            # The features are handled by the workers of the queue, so a burst of messages can not exhaust the database connections
+            low_value = all(is_low_value is not None and is_low_value(msg) for _, _, is_low_value in enabled_features)
+            if not self.__queue.put(msg.guild.id, (msg, enabled_features, begin), low_value):
+                self._logger.debug(f"Dropped the message {msg.id} in {msg.channel.name} ({msg.channel.id}), the queue is full")
+        except Exception as error:
+            traceback.print_exception(type(error), error, error.__traceback__)
 
-                self._logger.debug(f"Handled {sum(functionality)} functionalities in {get_elapsed_time_milliseconds(datetime.now().timestamp() - begin)} for {msg.channel.name} ({msg.channel.id}) send by {msg.author.name} ({msg.author.id})")
-            else:
-                self._logger.debug(f"No functionalities for {msg.channel.name} ({msg.channel.id}) defined")
+    async def __handle_message(self, queued:tuple[discord.Message, list[tuple[str, Callable[[discord.Message], Awaitable], Callable | None]], float]):
+        """Called by the workers of the queue, handles the message with all its enabled features"""
+        msg, enabled_features, begin = queued
+        try:
+            # The features are independent of each other, so they handle the message concurrently
+            # Their querys use the background pool, so a burst of messages does not delay the commands
+            latencies:dict[str, float] = {}
+            database:Main_DB_Controller = self.__bot.database
+            with database.use_pool("background"):
+                tasks = {asyncio.create_task(self.__run_feature(name, handler, msg, latencies)): name for name, handler, _ in enabled_features}
+            try:
+                _, pending = await asyncio.wait(tasks, timeout = self.MESSAGE_DEADLINE)
+            except asyncio.CancelledError:
+                # The queue is being stopped, the features still running are cancelled with it
+                for task in tasks:
+                    task.cancel()
+                raise
+            for task in pending:
+                task.cancel()
+                self._logger.warning(f"Feature {tasks[task]} did not handle the message {msg.id} within {self.MESSAGE_DEADLINE} seconds and has been cancelled")
+
+            feature_latencies = ", ".join(
+                f"{name} in {get_elapsed_time_milliseconds(latencies[name])}" if name in latencies else f"{name} cancelled"
+                for name in tasks.values()
+            )
+            self._logger.debug(f"Handled {len(tasks)} functionalities in {get_elapsed_time_milliseconds(datetime.now().timestamp() - begin)} ({feature_latencies}) for {msg.channel.name} ({msg.channel.id}) send by {msg.author.name} ({msg.author.id})")
         except Exception as error:
             traceback.print_exception(type(error), error, error.__traceback__)
 
     async def cog_load(self):
+        bot_config = Advanced_ConfigParser(Path.joinpath(self.__bot.base_path, "config", "bot.ini"))
+        self.__queue = Fair_Work_Queue(
+            self.__handle_message,
+            workers = int(bot_config["MESSAGE_QUEUE"]["WORKERS"]),
+            max_size = int(bot_config["MESSAGE_QUEUE"]["MAX_SIZE"]),
+            name = "messages"
+        )
+        self.__queue.start()
+
         await self.__bot.load_extension("cogs.event.message.impls.experience_impl")
-        self.__experience = Experience_Impl(self.__bot)
+        experience = Experience_Impl(self.__bot)
+        self.register_feature("experience", 0, experience.handle, experience.is_low_value)
         await self.__bot.load_extension("cogs.event.message.impls.pick_money_impl")
-        self.__pick_money = PickMoney_Impl(self.__bot)
+        self.register_feature("pick_money", 1, PickMoney_Impl(self.__bot).handle)
         return await super().cog_load()
 
     async def cog_unload(self):
+        await self.__queue.stop()
+        self.unregister_feature("experience")
         await self.__bot.unload_extension("cogs.event.message.impls.experience_impl")
+        self.unregister_feature("pick_money")
         await self.__bot.unload_extension("cogs.event.message.impls.pick_money_impl")
         return await super().cog_unload()
 
 async def setup(bot: commands.Bot):
-    await bot.add_cog(Message_Events(bot))
\ No newline at end of file
+    await bot.add_cog(Message_Events(bot))
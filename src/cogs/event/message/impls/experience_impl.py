@@ -1,36 +1,51 @@
 from discord.ext import commands
 import discord
 import logging
+import math
 from utils.database.main_controller import Main_DB_Controller
+from utils.cooldown_tracker import Cooldown_Tracker
 
 class Experience_Impl:
+    # Seconds a user has to wait, before another message is rewarded with experience
+    EXPERIENCE_COOLDOWN = 60.0
+
     def __init__(self, bot:commands.Bot) -> None:
         self.__bot = bot
         self.__logger = logging.getLogger("evnt.msg.experience")
+        self.__cooldowns = Cooldown_Tracker(self.EXPERIENCE_COOLDOWN)
+
+    def is_low_value(self, msg:discord.Message) -> bool:
+        """Returns `True` if the author is known to be on cooldown, so the message would not be rewarded anyway"""
+        return self.__cooldowns.is_on_cooldown(msg.guild.id, msg.author.id)
 
     async def handle(self, msg:discord.Message):
-        # Check if the user is applicable for getting experience
         database:Main_DB_Controller = self.__bot.database
-        if await database.user_for_experience_applicable(msg.guild.id, msg.author.id) == False:
-            return
-        await database.reset_user_experience_gain(msg.guild.id, msg.author.id)
-
-        # Load settings for the experience channel
-        channel_settings:tuple = await database.get_experience_settings(msg.channel.id)
-        if channel_settings is None:
-            self.__logger.error(f"Channel {msg.channel.name} (ID: {msg.channel.id}, GUILD: {msg.guild.name}) has activated the gain of experience, but no settings could be found. Was there a problem saving?")
-            return
-        multiplier, minimum_threshold, maximum_experience = channel_settings
-
-        # Get length of message and multiply with multiplier
-        experience = len(msg.content) * multiplier
-        if experience < minimum_threshold:
-            return
-        if experience > maximum_experience:
-            experience = maximum_experience
-        
-        # Add to users experience
-        leveled_up, user_lvl, user_xp = await database.add_to_user_experience(msg.guild.id, msg.author.id, experience)
+        if database.experience_buffer_enabled:
+            # The experience is added in memory, so the tracker is the only cooldown applied
+            if not self.__cooldowns.try_claim(msg.guild.id, msg.author.id):
+                return
+            experience = await self.__calculate_experience(msg)
+            if not experience:
+                return
+            leveled_up, user_lvl, user_xp = await database.add_to_user_experience(msg.guild.id, msg.author.id, experience)
+        else:
+            # Users known to be on cooldown are skipped, without asking the database
+            if self.__cooldowns.is_on_cooldown(msg.guild.id, msg.author.id):
+                return
+            # Claim the cooldown, apply the channel settings and add to the users experience in one round trip
+            result = await database.award_message_experience(msg.guild.id, msg.author.id, msg.channel.id, len(msg.content), self.EXPERIENCE_COOLDOWN)
+            if result is None:
+                return
+            # The database is the authority on the cooldown, the tracker only follows the claims it has confirmed
+            self.__cooldowns.start_cooldown(msg.guild.id, msg.author.id)
+            experience, leveled_up, user_lvl, user_xp = result
+
+            if experience is None:
+                self.__log_missing_settings(msg)
+                return
+            if experience == 0:
+                return
+
         additonal_log = ""
         if leveled_up:
             embed = discord.Embed(
@@ -40,6 +55,21 @@ class Experience_Impl:
             additonal_log = " and did level up!"
         self.__logger.debug(f"User {msg.author.name} has gained {experience}{additonal_log} (current xp: {user_xp}) by sending a message into the {msg.channel.name} channel")
 
+    async def __calculate_experience(self, msg:discord.Message) -> int | None:
+        """Calculates the experience for the message from the settings of the channel, returns 0 if the message is below the threshold"""
+        database:Main_DB_Controller = self.__bot.database
+        settings = await database.get_experience_settings(msg.channel.id)
+        if settings is None:
+            self.__log_missing_settings(msg)
+            return None
+        multiplier, minimum_threshold, maximum_experience = settings
+        experience = len(msg.content) * multiplier
+        if experience < minimum_threshold:
+            return 0
+        return math.floor(min(experience, maximum_experience))
+
+    def __log_missing_settings(self, msg:discord.Message):
+        self.__logger.error(f"Channel {msg.channel.name} (ID: {msg.channel.id}, GUILD: {msg.guild.name}) has activated the gain of experience, but no settings could be found. Was there a problem saving?")
 
 async def setup(bot):
     pass
\ No newline at end of file
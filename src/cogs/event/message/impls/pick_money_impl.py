@@ -4,28 +4,31 @@ import logging
 from utils.database.main_controller import Main_DB_Controller
 import random
 from pathlib import Path
+from utils.spawn_scheduler import Spawn_Scheduler
 
 class PickMoney_Impl:
     def __init__(self, bot:commands.Bot) -> None:
         self.__bot = bot
         self.__logger = logging.getLogger("evnt.msg.pickmoney")
+        self.__scheduler = Spawn_Scheduler()
 
     async def handle(self, msg:discord.Message):
-        database:Main_DB_Controller = self.__bot.client.database
-        # Load settings for the pick money channel
+        database:Main_DB_Controller = self.__bot.database
+        # Load settings for the pick money channel (from memory, once the channel settings are preloaded)
         channel_settings:tuple = await database.get_pick_money_settings(msg.channel.id)
         if channel_settings is None:
+            self.__scheduler.forget(msg.channel.id)
             self.__logger.error(f"Channel {msg.channel.name} (ID: {msg.channel.id}, GUILD: {msg.guild.name}) has activated the apperance of pick money, but no settings could be found. Was there a problem saving?")
             return
         min_amount, max_amount, probability = channel_settings
 
-        # Randomize if the message is going to appear and the amount of money
-        if random.randint(1, probability) != 1:
-            return 
+        # Count down to the next appearance, which has the same chance as rolling 1 in `probability` for every message
+        if not self.__scheduler.tick(msg.channel.id, probability):
+            return
         amount = random.randint(min_amount, max_amount)
 
         # Create and send the embed
-        file_path = Path(self.__portal.source_path) / "assets" / "img1.jpg"
+        file_path = Path.joinpath(self.__bot.base_path, "src", "assets", "img1.jpg")
         attatchment_image = discord.File(file_path)
         message = await msg.channel.send(
             content = f"`{amount}` :dollar: have appeared randomly, collect them by typing `/pick`, quick!",
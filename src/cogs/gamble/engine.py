@@ -0,0 +1,201 @@
+from abc import abstractmethod
+from collections import Counter, deque
+from datetime import datetime
+import discord
+import logging
+import math
+from cogs.gamble.rules import Gamble_Rules
+from utils.database.main_controller import Main_DB_Controller
+from utils.datetime_tools import get_elapsed_time_milliseconds
+
+class Gamble_Game(Gamble_Rules):
+    """Abstract class for a game played through the `Settlement_Engine`
+
+    The rules decide the outcome of a round, the game how it is displayed and the engine takes care of the balance"""
+    # Title of the embeds
+    TITLE:str
+
+    @abstractmethod
+    def create_embed(self, outcome:object, bet:int, multiplier:float, payout:int) -> discord.Embed:
+        """Returns the embed presenting the outcome of a round to the user"""
+        pass
+
+class Gamble_Statistics:
+    """Counters for all rounds of one game settled since the engine was created"""
+    # Number of settle latencies kept to calculate the percentiles
+    LATENCY_SAMPLES = 1000
+
+    def __init__(self):
+        self.__start = datetime.now().timestamp()
+        self.bets = 0
+        self.wagered = 0
+        self.paid_out = 0
+        self.__latencies:deque[float] = deque(maxlen = self.LATENCY_SAMPLES)
+
+    def record(self, bet:int, payout:int, latency:float, rounds:int = 1):
+        self.bets += rounds
+        self.wagered += bet
+        self.paid_out += payout
+        self.__latencies.append(latency)
+
+    @property
+    def bets_per_second(self) -> float:
+        """Average number of settled bets per second"""
+        elapsed = datetime.now().timestamp() - self.__start
+        return self.bets / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def house_edge(self) -> float:
+        """Share of the wagered money kept by the house, as realised by the settled bets"""
+        return 1 - self.paid_out / self.wagered if self.wagered else 0.0
+
+    def latency_percentile(self, percentile:float) -> float:
+        """Returns the settle latency in seconds, that the given percentile of the most recent bets stayed below"""
+        if not self.__latencies:
+            return 0.0
+        latencies = sorted(self.__latencies)
+        return latencies[min(math.ceil(len(latencies) * percentile / 100) - 1, len(latencies) - 1)]
+
+class Settlement_Engine:
+    """Plays and settles the rounds of all gamble games
+
+    Takes the bet and credits the payout with a single conditional statement, so the balance is never overdrawn"""
+    # Maximum number of rounds played with a single command
+    MAX_ROUNDS = 100
+    # Largest balance the database can store (INTEGER column)
+    MAX_BALANCE = 2 ** 31 - 1
+
+    def __init__(self):
+        self.__logger = logging.getLogger("cmds.gamble.engine")
+        self.__statistics:dict[str, Gamble_Statistics] = {}
+
+    async def play(self, ctx:discord.Interaction, game:Gamble_Game, bet:int, *arguments):
+        """Plays a round of the game with the bet of the user and responds to the interaction"""
+        # Check if bet is greater than the minimum bet
+        if bet < game.MINIMUM_BET:
+            embed = discord.Embed(
+                description = f"You can bet not less than `{game.MINIMUM_BET}` :dollar:",
+                color = 0xDB3F2F
+            )
+            await ctx.response.send_message(embed = embed)
+            return
+
+        database:Main_DB_Controller = ctx.client.database
+        # No balance can cover a bet beyond the range of the column, nor could the bet be passed to the query
+        if bet > self.MAX_BALANCE:
+            await self.__send_insufficient_balance(ctx, database, bet)
+            return
+
+        # The outcome is decided first, so the bet and the payout are settled together
+        outcome_class, outcome = game.roll(*arguments)
+        multiplier = game.PAYOUT_TABLE[outcome_class]
+        payout = math.floor(bet * multiplier)
+
+        begin_settle = datetime.now().timestamp()
+        new_balance = await database.settle_bet(ctx.guild_id, ctx.user.id, bet, payout)
+        settle_latency = datetime.now().timestamp() - begin_settle
+        if new_balance is None:
+            await self.__send_insufficient_balance(ctx, database, bet)
+            return
+
+        self.get_statistics(game.NAME).record(bet, payout, settle_latency)
+        self.__logger.debug(f"User {ctx.user.name} has bet {bet} on {game.NAME} and won {payout} (settled after {get_elapsed_time_milliseconds(settle_latency)})")
+        await ctx.response.send_message(embed = game.create_embed(outcome, bet, multiplier, payout))
+
+    async def play_rounds(self, ctx:discord.Interaction, game:Gamble_Game, bet:int, rounds:int, *arguments):
+        """Plays many rounds of the game with the same bet, settles the net result at once and responds with a summary
+
+        A single round is played and presented like a normal command"""
+        if rounds <= 1:
+            await self.play(ctx, game, bet, *arguments)
+            return
+        if rounds > self.MAX_ROUNDS:
+            embed = discord.Embed(
+                description = f"You can play not more than `{self.MAX_ROUNDS}` rounds at once",
+                color = 0xDB3F2F
+            )
+            await ctx.response.send_message(embed = embed)
+            return
+        if bet < game.MINIMUM_BET:
+            embed = discord.Embed(
+                description = f"You can bet not less than `{game.MINIMUM_BET}` :dollar:",
+                color = 0xDB3F2F
+            )
+            await ctx.response.send_message(embed = embed)
+            return
+
+        database:Main_DB_Controller = ctx.client.database
+        total_bet = bet * rounds
+        # No balance can cover a bet beyond the range of the column, nor could the bet be passed to the query
+        if total_bet > self.MAX_BALANCE:
+            await self.__send_insufficient_balance(ctx, database, total_bet)
+            return
+
+        # All outcomes are drawn at once, each round pays out the floored bet times its multiplier
+        outcome_counts = game.roll_many(rounds)
+        multiplier_counts:Counter[float] = Counter()
+        for outcome_class, count in outcome_counts.items():
+            multiplier_counts[game.PAYOUT_TABLE[outcome_class]] += count
+        total_payout = sum(math.floor(bet * multiplier) * count for multiplier, count in multiplier_counts.items())
+
+        begin_settle = datetime.now().timestamp()
+        new_balance = await database.settle_bet(ctx.guild_id, ctx.user.id, total_bet, total_payout)
+        settle_latency = datetime.now().timestamp() - begin_settle
+        if new_balance is None:
+            await self.__send_insufficient_balance(ctx, database, total_bet)
+            return
+
+        self.get_statistics(game.NAME).record(total_bet, total_payout, settle_latency, rounds)
+        self.__logger.debug(f"User {ctx.user.name} has bet {total_bet} on {rounds} rounds of {game.NAME} and won {total_payout} (settled after {get_elapsed_time_milliseconds(settle_latency)})")
+
+        embed = discord.Embed(
+            title = f"{game.TITLE} ({rounds} rounds)",
+            description = "\n".join(
+                f"`{multiplier}`x: {count} {'round' if count == 1 else 'rounds'}"
+                for multiplier, count in sorted(multiplier_counts.items(), reverse = True)
+            )
+        )
+        embed.add_field(
+            name = "Bet:",
+            value = f"`{rounds}` x `{bet}` :dollar:"
+        )
+        embed.add_field(
+            name = "Payout:",
+            value = f"`{total_payout}` :dollar:"
+        )
+        embed.add_field(
+            name = "Balance:",
+            value = f"`{new_balance}` :dollar:"
+        )
+        await ctx.response.send_message(embed = embed)
+
+    async def __send_insufficient_balance(self, ctx:discord.Interaction, database:Main_DB_Controller, bet:int):
+        user_balance = await database.get_user_currency(ctx.guild_id, ctx.user.id)
+        if user_balance is None:
+            embed = discord.Embed(
+                description = "You do not have an account balance yet\nCollect your dailymoney or get gifted some",
+                color = 0xDB3F2F
+            )
+        else:
+            embed = discord.Embed(
+                description = (
+                    "Your credit is not sufficient\n"
+                    f"You are trying to gamble with `{bet}` :dollar:, but you only have `{user_balance}` :dollar:"
+                ),
+                color = 0xDB3F2F
+            )
+        await ctx.response.send_message(embed = embed)
+
+    def get_statistics(self, game_name:str) -> Gamble_Statistics:
+        """Returns the counters of the game, creating them on first use"""
+        statistics = self.__statistics.get(game_name)
+        if statistics is None:
+            statistics = self.__statistics[game_name] = Gamble_Statistics()
+        return statistics
+
+    def get_all_statistics(self) -> dict[str, tuple[int, float, float, float]]:
+        """Returns the number of bets, bets per second, realised house edge and p99 settle latency (in seconds), indexed by the name of the game"""
+        return {
+            game_name: (statistics.bets, statistics.bets_per_second, statistics.house_edge, statistics.latency_percentile(99))
+            for game_name, statistics in self.__statistics.items()
+        }
@@ -1,73 +1,30 @@
 from discord.ext import commands
 import logging
-from utils.database.main_controller import Main_DB_Controller
+from cogs.gamble.engine import Gamble_Game, Settlement_Engine
+from cogs.gamble.rules import Betroll_Rules
 import discord
-import random
-import math
 
-class Betroll_Impl:
-    def __init__(self, bot:commands.Bot) -> None:
+class Betroll_Impl(Gamble_Game, Betroll_Rules):
+    TITLE = "Betroll"
+
+    def __init__(self, bot:commands.Bot, engine:Settlement_Engine) -> None:
         self.__bot = bot
+        self.__engine = engine
         self.__logger = logging.getLogger("cmds.gamble.betroll")
 
-    async def on_command(self, ctx:discord.Interaction, bet:int):
-        database:Main_DB_Controller = ctx.client.database
-        # Check sufficient user balance
-        user_balance = await database.get_user_currency(ctx.guild_id, ctx.user.id)
-        if user_balance is None:
-            embed = discord.Embed(
-                description = "You do not have an account balance yet\nCollect your dailymoney or get gifted some",
-                color = 0xDB3F2F
-            )
-            await ctx.response.send_message(embed = embed)
-            return
-        if user_balance < bet:
-            embed = discord.Embed(
-                description = (
-                    "Your credit is not sufficient\n"
-                    f"You are trying to gamble with `{bet}` :dollar:, but you only have `{user_balance}` :dollar:"
-                ),
-                color = 0xDB3F2F
-            )
-            await ctx.response.send_message(embed = embed)
-            return
-        
-        # Check if bet is greater than 10 dollar
-        if bet < 2:
-            embed = discord.Embed(
-                description = "You can bet not less than `2` :dollar:",
-                color = 0xDB3F2F
-            )
-            await ctx.response.send_message(embed = embed)
-            return
-        
-        # Randomize the 10 dice
-        dice_emojis = ""
-        eye_sum = 0
-        for _ in range(10):
-            eyes = random.randint(1, 10)
-            eye_sum += eyes
-            dice_emojis += f":number_{eyes}: "
+    async def on_command(self, ctx:discord.Interaction, bet:int, rounds:int = 1):
+        await self.__engine.play_rounds(ctx, self, bet, rounds)
 
-        if eye_sum <= 66:
-            multiplicator = 0
-        elif eye_sum > 66 and eye_sum <= 90:
-            multiplicator = 2
-        elif eye_sum > 90 and eye_sum < 100:
-            multiplicator = 4
-        else:
-            multiplicator = 10
-        payout = math.floor(bet * multiplicator)
-        
-        # Create the embed
+    def create_embed(self, outcome:list[int], bet:int, multiplier:float, payout:int) -> discord.Embed:
+        dice_emojis = "".join(f":number_{eyes}: " for eyes in outcome)
         embed = discord.Embed(
-            title = "Betroll",
+            title = self.TITLE,
             description = f"The dice have been cast as follows:\n{dice_emojis}"
         )
 
         embed.add_field(
             name = "Dice eyes sum:",
-            value = f"`{eye_sum}`",
+            value = f"`{sum(outcome)}`",
             inline = False
         )
         embed.add_field(
@@ -76,21 +33,13 @@ class Betroll_Impl:
         )
         embed.add_field(
             name = "Multiplier:",
-            value = f"`{multiplicator}`"
+            value = f"`{multiplier}`"
         )
         embed.add_field(
             name = "Payout:",
             value = f"`{payout}` :dollar:"
         )
-        await ctx.response.send_message(embed = embed)
-
-        # Change the user's balance
-        if payout == bet:
-            pass
-        elif payout > bet:
-            await database.add_to_user_balance(ctx.guild_id, ctx.user.id, payout - bet)
-        elif payout < bet:
-            await database.substract_from_user_balance(ctx.guild_id, ctx.user.id, bet - payout)
+        return embed
 
 async def setup(bot):
     pass
\ No newline at end of file
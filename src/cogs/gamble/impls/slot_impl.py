@@ -1,72 +1,26 @@
 from discord.ext import commands
 import logging
-from utils.database.main_controller import Main_DB_Controller
+from cogs.gamble.engine import Gamble_Game, Settlement_Engine
+from cogs.gamble.rules import Slot_Rules
 import discord
-import random
-import math
 
-class Slot_Impl:
-    def __init__(self, bot:commands.Bot):
+class Slot_Impl(Gamble_Game, Slot_Rules):
+    TITLE = "Slots"
+    # Indexed by the position of the roller, the last one is the flower
+    EMOJIS = [":butterfly:", ":heart:", ":dolphin:", ":sun_with_face:", ":green_apple:", ":cherry_blossom:"]
+
+    def __init__(self, bot:commands.Bot, engine:Settlement_Engine):
         self.__bot = bot
+        self.__engine = engine
         self.__logger = logging.getLogger("cmds.gamble.slot")
 
-    async def on_command(self, ctx:discord.Interaction, bet:int):
-        database:Main_DB_Controller = ctx.client.database
-        EMOJIS = [":butterfly:", ":heart:", ":dolphin:", ":sun_with_face:", ":green_apple:", ":cherry_blossom:"]
-        MAX_VALUE = len(EMOJIS) - 1
-
-        # Check sufficient user balance
-        user_balance = await database.get_user_currency(ctx.guild_id, ctx.user.id)
-        if user_balance is None:
-            embed = discord.Embed(
-                description = "You do not have an account balance yet\nCollect your dailymoney or get gifted some",
-                color = 0xDB3F2F
-            )
-            await ctx.response.send_message(embed = embed)
-            return
-        if user_balance < bet:
-            embed = discord.Embed(
-                description = (
-                    "Your credit is not sufficient\n"
-                    f"You are trying to gamble with `{bet}` :dollar:, but you only have `{user_balance}` :dollar:"
-                ),
-                color = 0xDB3F2F
-            )
-            await ctx.response.send_message(embed = embed)
-            return
-        
-        # Check if bet is greater than 10 dollar
-        if bet < 10:
-            embed = discord.Embed(
-                description = "You can bet not less than `10` :dollar:",
-                color = 0xDB3F2F
-            )
-            await ctx.response.send_message(embed = embed)
-            return
-        
-        # Randomize the symbols
-        slot_emojis = ""
-        slot_positions = []
-        for _ in range(3):
-            position = random.randint(0, MAX_VALUE)
-            slot_positions.append(position)
-            slot_emojis += f"{EMOJIS[position]} "
+    async def on_command(self, ctx:discord.Interaction, bet:int, rounds:int = 1):
+        await self.__engine.play_rounds(ctx, self, bet, rounds)
 
-        if all(n == MAX_VALUE for n in slot_positions):
-            multiplicator = 30  # Three flowers
-        elif all(n == slot_positions[0] for n in slot_positions):
-            multiplicator = 10  # Three same
-        elif sum(1 for n in slot_positions if n == MAX_VALUE) == 2:
-            multiplicator = 4  # Two flowers
-        elif any(n == MAX_VALUE for n in slot_positions):
-            multiplicator = 1  # One flowers
-        else:
-            multiplicator = 0  # No payout
-        payout = math.floor(bet * multiplicator)
-
-        # Create the embed
+    def create_embed(self, outcome:list[int], bet:int, multiplier:float, payout:int) -> discord.Embed:
+        slot_emojis = "".join(f"{self.EMOJIS[position]} " for position in outcome)
         embed = discord.Embed(
-            title = "Slots",
+            title = self.TITLE,
             description = f"The rollers have come to a standstill at the following points:\n{slot_emojis}"
         )
         embed.add_field(
@@ -75,21 +29,13 @@ class Slot_Impl:
         )
         embed.add_field(
             name = "Multiplier:",
-            value = f"`{multiplicator}`"
+            value = f"`{multiplier}`"
         )
         embed.add_field(
             name = "Payout:",
             value = f"`{payout}` :dollar:"
         )
-        await ctx.response.send_message(embed = embed)
-
-        # Change the user's balance
-        if payout == bet:
-            pass
-        elif payout > bet:
-            await database.add_to_user_balance(ctx.guild_id, ctx.user.id, payout - bet)
-        elif payout < bet:
-            await database.substract_from_user_balance(ctx.guild_id, ctx.user.id, bet - payout)
+        return embed
 
 async def setup(bot):
     pass
\ No newline at end of file
@@ -0,0 +1,211 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+from datetime import datetime
+from functools import cached_property
+from itertools import accumulate, product
+from typing import Hashable
+import math
+import random
+
+class Gamble_Rules(ABC):
+    """Abstract class holding the rules of a gamble game: How an outcome is randomized and what it pays out
+
+    The rules do not depend on discord, so the return to player of a game can be calculated and simulated on its own"""
+    # Name of the game, used for the statistics
+    NAME:str
+    # Smallest amount a user is allowed to bet
+    MINIMUM_BET:int
+    # Multiplier of the bet paid out, indexed by the class of outcome returned by `roll`
+    PAYOUT_TABLE:dict[Hashable, float]
+
+    @abstractmethod
+    def roll(self, *arguments) -> tuple[Hashable, object]:
+        """Randomizes the outcome of a single round, the `arguments` are the ones the user has passed to the command (e.g. a guess)
+
+        Returns the class of the outcome (a key of the `PAYOUT_TABLE`) and the outcome itself, as needed to present it"""
+        pass
+
+    @abstractmethod
+    def get_outcome_weights(self) -> dict[Hashable, int]:
+        """Returns the relative probability of each class of outcome (keys of the `PAYOUT_TABLE`) in a single round, as integer weights"""
+        pass
+
+    @cached_property
+    def _outcome_distribution(self) -> tuple[list[Hashable], list[int]]:
+        """Classes of outcome and their cumulative weights, calculated once per game"""
+        weights = self.get_outcome_weights()
+        return list(weights.keys()), list(accumulate(weights.values()))
+
+    def roll_many(self, rounds:int) -> Counter[Hashable]:
+        """Randomizes the outcome of many rounds at once, by drawing from the distribution of the outcome classes
+
+        Returns how often each class of outcome occured"""
+        outcome_classes, cumulative_weights = self._outcome_distribution
+        return Counter(random.choices(outcome_classes, cum_weights = cumulative_weights, k = rounds))
+
+    def get_return_factors(self, bet:int = None) -> dict[Hashable, float]:
+        """Returns the share of the bet paid out for each class of outcome
+
+        Without a `bet` the plain multipliers are returned, otherwise the payout is floored like it is done when settling"""
+        if bet is None:
+            return dict(self.PAYOUT_TABLE)
+        return {outcome_class: math.floor(bet * multiplier) / bet for outcome_class, multiplier in self.PAYOUT_TABLE.items()}
+
+    def get_return_to_player(self, bet:int = None) -> tuple[float, float]:
+        """Calculates the exact expected return to player (share of the bet paid out on average) and its variance per round"""
+        weights = self.get_outcome_weights()
+        total_weight = sum(weights.values())
+        factors = self.get_return_factors(bet)
+        expected = sum(weights[outcome_class] * factors[outcome_class] for outcome_class in weights) / total_weight
+        expected_square = sum(weights[outcome_class] * factors[outcome_class] ** 2 for outcome_class in weights) / total_weight
+        return expected, expected_square - expected ** 2
+
+    def simulate(self, rounds:int, bet:int = None, chunk_size:int = 1_000_000) -> tuple[float, float, float]:
+        """Plays the given number of rounds using `roll_many`, in chunks to keep the memory bounded
+
+        Returns the return to player and its variance as observed, aswell as the number of outcomes generated per second"""
+        factors = self.get_return_factors(bet)
+        total_return = 0.0
+        total_square = 0.0
+        begin_simulation = datetime.now().timestamp()
+        remaining = rounds
+        while remaining > 0:
+            outcome_counts = self.roll_many(min(chunk_size, remaining))
+            remaining -= chunk_size
+            for outcome_class, count in outcome_counts.items():
+                total_return += factors[outcome_class] * count
+                total_square += factors[outcome_class] ** 2 * count
+        elapsed = datetime.now().timestamp() - begin_simulation
+
+        expected = total_return / rounds
+        return expected, total_square / rounds - expected ** 2, rounds / elapsed if elapsed > 0 else float("inf")
+
+class Betflip_Rules(Gamble_Rules):
+    NAME = "betflip"
+    MINIMUM_BET = 2
+    # Indexed by whether the guess was correct
+    PAYOUT_TABLE = {
+        True: 1.95,
+        False: 0
+    }
+
+    def roll(self, guess:int = 0) -> tuple[bool, tuple[int, int]]:
+        # Randomize the upper side of the coin
+        coin_upper = random.randint(0, 1)
+        return coin_upper == guess, (guess, coin_upper)
+
+    def get_outcome_weights(self) -> dict[bool, int]:
+        # Both sides of the coin are equally likely, whatever the guess is
+        return {True: 1, False: 1}
+
+class Betroll_Rules(Gamble_Rules):
+    NAME = "betroll"
+    MINIMUM_BET = 2
+    NUMBER_OF_DICE = 10
+    DIE_SIDES = 10
+    # Indexed by the upper bound (inclusive) of the sum of the dice eyes
+    PAYOUT_TABLE = {
+        66: 0,
+        90: 2,
+        99: 4,
+        100: 10
+    }
+
+    def roll(self) -> tuple[int, list[int]]:
+        # Randomize the 10 dice
+        dice_eyes = [random.randint(1, self.DIE_SIDES) for _ in range(self.NUMBER_OF_DICE)]
+        return self.classify(sum(dice_eyes)), dice_eyes
+
+    def classify(self, eye_sum:int) -> int:
+        """Returns the class of outcome (upper bound of the range) for the sum of the dice eyes"""
+        return next(upper_bound for upper_bound in self.PAYOUT_TABLE if eye_sum <= upper_bound)
+
+    def get_outcome_weights(self) -> dict[int, int]:
+        # Number of ways to cast each sum with the dice, built up one die at a time
+        sum_ways = {0: 1}
+        for _ in range(self.NUMBER_OF_DICE):
+            next_ways = {}
+            for eye_sum, ways in sum_ways.items():
+                for eyes in range(1, self.DIE_SIDES + 1):
+                    next_ways[eye_sum + eyes] = next_ways.get(eye_sum + eyes, 0) + ways
+            sum_ways = next_ways
+
+        weights = {upper_bound: 0 for upper_bound in self.PAYOUT_TABLE}
+        for eye_sum, ways in sum_ways.items():
+            weights[self.classify(eye_sum)] += ways
+        return weights
+
+class Slot_Rules(Gamble_Rules):
+    NAME = "slot"
+    MINIMUM_BET = 10
+    NUMBER_OF_SYMBOLS = 6
+    # The last symbol is the flower
+    FLOWER = NUMBER_OF_SYMBOLS - 1
+    PAYOUT_TABLE = {
+        "three_flowers": 30,
+        "three_same": 10,
+        "two_flowers": 4,
+        "one_flower": 1,
+        "none": 0
+    }
+
+    def roll(self) -> tuple[str, list[int]]:
+        # Randomize the symbols
+        slot_positions = [random.randint(0, self.FLOWER) for _ in range(3)]
+        return self.classify(slot_positions), slot_positions
+
+    def classify(self, slot_positions:list[int]) -> str:
+        """Returns the class of outcome for the positions of the three rollers"""
+        flowers = slot_positions.count(self.FLOWER)
+        if flowers == 3:
+            return "three_flowers"
+        elif all(n == slot_positions[0] for n in slot_positions):
+            return "three_same"
+        elif flowers == 2:
+            return "two_flowers"
+        elif flowers == 1:
+            return "one_flower"
+        return "none"
+
+    def get_outcome_weights(self) -> dict[str, int]:
+        # Each combination of the rollers is equally likely
+        weights = Counter(self.classify(list(positions)) for positions in product(range(self.NUMBER_OF_SYMBOLS), repeat = 3))
+        return {outcome_class: weights[outcome_class] for outcome_class in self.PAYOUT_TABLE}
+
+class Wheel_Rules(Gamble_Rules):
+    NAME = "wheel"
+    MINIMUM_BET = 10
+    # Indexed by the position of the wheel, starting at the top and going clockwise
+    PAYOUT_TABLE = {
+        0: 1.7,
+        1: 2.4,
+        2: 1.2,
+        3: 0.5,
+        4: 0.3,
+        5: 0.1,
+        6: 0.2,
+        7: 1.5
+    }
+
+    def roll(self) -> tuple[int, int]:
+        # Randomize the position of the wheel
+        position = random.randrange(len(self.PAYOUT_TABLE))
+        return position, position
+
+    def get_outcome_weights(self) -> dict[int, int]:
+        return {position: 1 for position in self.PAYOUT_TABLE}
+
+
+if __name__ == "__main__":
+    # Compares the exact and simulated return to player of every game, e.g. "python -m cogs.gamble.rules 100000000" from within src
+    import sys
+    from tabulate import tabulate
+
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000_000
+    rows = []
+    for rules in [Betflip_Rules(), Betroll_Rules(), Slot_Rules(), Wheel_Rules()]:
+        expected, variance = rules.get_return_to_player()
+        floored_expected, _ = rules.get_return_to_player(rules.MINIMUM_BET)
+        simulated, simulated_variance, rounds_per_second = rules.simulate(rounds)
+        rows.append([rules.NAME, f"{expected:.4%}", f"{floored_expected:.4%}", f"{variance:.4f}", f"{simulated:.4%}", f"{simulated_variance:.4f}", f"{rounds_per_second:,.0f}"])
+    print(tabulate(rows, headers = ["Game", "RTP", "RTP (min. bet)", "Variance", f"Simulated RTP ({rounds:,} rounds)", "Simulated variance", "Rounds/s"]))
@@ -7,6 +7,7 @@ from cogs.leveling.impls.setup_impl import Setup_Impl
 from cogs.leveling.impls.configure_impl import Configure_Impl
 from cogs.leveling.impls.copy_impl import Copy_Impl
 from cogs.leveling.impls.info_impl import Info_Impl
+from cogs.leveling.impls.recompute_impl import Recompute_Impl
 
 class Leveling_CommandGroup(Base_GroupCog, group_name = "leveling"):
     def __init__(self, bot:commands.Bot):
@@ -14,6 +15,7 @@ class Leveling_CommandGroup(Base_GroupCog, group_name = "leveling"):
         self.__configure:Configure_Impl = None
         self.__copy:Copy_Impl = None
         self.__info:Info_Impl = None
+        self.__recompute:Recompute_Impl = None
 
         self.__bot = bot
         super().__init__(logging.getLogger("cmds.leveling"))
@@ -40,6 +42,10 @@ class Leveling_CommandGroup(Base_GroupCog, group_name = "leveling"):
     async def info(self, ctx:discord.Interaction, channel:discord.TextChannel = None):
         await self.__info.on_command(ctx, channel)
 
+    @app_commands.command(name = "recompute", description = "Recomputes the level of every user from their total experience (bot owner only)")
+    async def recompute(self, ctx:discord.Interaction):
+        await self.__recompute.on_command(ctx)
+
     async def cog_load(self):
         await self.__bot.load_extension("cogs.leveling.impls.shared_functions")
 
@@ -56,6 +62,9 @@ class Leveling_CommandGroup(Base_GroupCog, group_name = "leveling"):
         await self.__bot.load_extension("cogs.leveling.impls.info_impl")
         self.__info = Info_Impl(self.__bot)
 
+        await self.__bot.load_extension("cogs.leveling.impls.recompute_impl")
+        self.__recompute = Recompute_Impl(self.__bot)
+
         await self.__bot.load_extension("cogs.leveling.impls.setup_impl")
         self.__setup = Setup_Impl(self.__bot, self.__configure, self.__copy)
         await self.__setup.on_load()
@@ -66,6 +75,8 @@ class Leveling_CommandGroup(Base_GroupCog, group_name = "leveling"):
         await self.__setup.on_unload()
         await self.__bot.unload_extension("cogs.leveling.impls.setup_impl")
 
+        await self.__bot.unload_extension("cogs.leveling.impls.recompute_impl")
+
         await self.__bot.unload_extension("cogs.leveling.impls.info_impl")
 
         await self.__copy.on_unload()
@@ -0,0 +1,73 @@
+from discord.ext import commands
+import discord
+import logging
+from datetime import datetime
+from utils.database.main_controller import Main_DB_Controller
+from utils.datetime_tools import get_elapsed_time_milliseconds
+
+class Recompute_Impl:
+    # Minimum number of seconds between two progress updates of the response
+    PROGRESS_INTERVAL = 2.0
+
+    def __init__(self, bot:commands.Bot):
+        self.__bot = bot
+        self.__logger = logging.getLogger("cmds.leveling.recompute")
+        self.__recompute_running = False
+
+    async def on_command(self, ctx:discord.Interaction):
+        # The levels of all guilds are affected, so only the owner of the bot may start the job
+        if not await self.__bot.is_owner(ctx.user):
+            embed = discord.Embed(
+                description = "Only the owner of the bot can recompute the levels",
+                color = 0xDB3F2F
+            )
+            await ctx.response.send_message(embed = embed, ephemeral = True)
+            return
+        if self.__recompute_running:
+            embed = discord.Embed(
+                description = "The levels are allready being recomputed",
+                color = 0xDB3F2F
+            )
+            await ctx.response.send_message(embed = embed, ephemeral = True)
+            return
+
+        self.__recompute_running = True
+        await ctx.response.defer(ephemeral = True, thinking = True)
+        begin_recompute = datetime.now().timestamp()
+        last_update = begin_recompute
+
+        async def report_progress(processed_users:int, total_users:int):
+            nonlocal last_update
+            now = datetime.now().timestamp()
+            self.__logger.debug(f"Recomputed the levels of {processed_users} / {total_users} users")
+            if now - last_update >= self.PROGRESS_INTERVAL:
+                last_update = now
+                await ctx.edit_original_response(embed = discord.Embed(
+                    description = f"Recomputing levels ... `{processed_users}` / `{total_users}` users ({processed_users / max(total_users, 1):.0%})"
+                ))
+
+        database:Main_DB_Controller = ctx.client.database
+        try:
+            processed_users, changed_users = await database.recompute_all_levels(report_progress)
+        except Exception as error:
+            self.__logger.error(f"Recomputing the levels failed ({error.__class__.__name__}: {error})")
+            await ctx.edit_original_response(embed = discord.Embed(
+                description = "Recomputing the levels failed, no changes have been made",
+                color = 0xDB3F2F
+            ))
+            raise
+        finally:
+            self.__recompute_running = False
+
+        elapsed = datetime.now().timestamp() - begin_recompute
+        self.__logger.info(f"Recomputed the levels of {processed_users} users ({changed_users} changed) after {get_elapsed_time_milliseconds(elapsed)}")
+        await ctx.edit_original_response(embed = discord.Embed(
+            description = (
+                f"Recomputed the levels of `{processed_users}` users after `{get_elapsed_time_milliseconds(elapsed)}`\n"
+                f"The level or experience of `{changed_users}` users has changed"
+            ),
+            color = 0x4BB543
+        ))
+
+async def setup(bot):
+    pass
\ No newline at end of file
@@ -8,41 +8,58 @@ import math
 from tabulate import tabulate
 from utils.calc_lvl_xp import calculate_current_level_experience
 from utils.interaction_handler.button import Button_Interaction_Handler
+from utils.page_cache import Page_Prefetcher, Rendered_Page_Cache
 
 class Ranks_Command(Base_Cog):
+    # Shown instead of a page, that could not be rendered because the database is overloaded
+    BUSY_MESSAGE = "The bot is very busy right now, please try again in a moment"
+
     def __init__(self, bot:commands.Bot):
         self.__bot = bot
+        # Rendered pages, invalidated whenever the experience on the guild changes
+        self.__page_cache = Rendered_Page_Cache()
+        self.__prefetcher = Page_Prefetcher()
         super().__init__(logging.getLogger("cmds.ranks"))
 
-    async def get_number_of_rank_pages(self, guild_id:int, page_size:int = 20) -> int:
-        """Returns the number of pages that can be displayed for the ranking"""
+    async def get_number_of_rank_pages(self, guild_id:int, page_size:int = 20) -> int | None:
+        """Returns the number of pages that can be displayed for the ranking
+
+        While the database is overloaded only a cached number is returned, None if there is none"""
         database:Main_DB_Controller = self.__bot.database
-        return math.ceil(await database.get_number_of_level_users(guild_id) / page_size)
+        version = database.get_experience_version(guild_id)
+        number_of_pages = self.__page_cache.get(guild_id, ("pages", page_size), version, allow_outdated = database.degraded)
+        if number_of_pages is None:
+            if database.degraded:
+                return None
+            number_of_pages = math.ceil(await database.get_number_of_level_users(guild_id) / page_size)
+            self.__page_cache.put(guild_id, ("pages", page_size), version, number_of_pages)
+        return number_of_pages
     
-    async def get_next_page_number(self, message_id:int, increase:bool = True) -> int:
-        """Returns the page number of the next page (starting with 0)
+    async def get_page_users(self, guild_id:int, current_page:int, cursor:tuple[int, int] | None = None, backwards:bool = False) -> list[tuple]:
+        """Returns the users displayed on the page (starting with 0)
         
-        When `increase` is `False`, it will be counted downwards, but never below zero"""
+        If a cursor of the adjacent page is provided, the users are seeked from it, instead of skipping all previous rows"""
         database:Main_DB_Controller = self.__bot.database
-        current_page = await database.get_ranks_page(message_id)
-        if increase:
-            current_page += 1
-        else:
-            current_page -= 1
-            if current_page < 0:
-                current_page = 0
-        return current_page
+        if current_page == 0 or cursor is None:
+            return await database.get_ranks_page_users(guild_id, current_page)
+        return await database.seek_ranks_page_users(guild_id, cursor, backwards = backwards)
     
-    async def get_table(self, guild:discord.Guild, page:int = 0) -> str:
+    @staticmethod
+    def get_page_cursors(users_info:list[tuple]) -> tuple[tuple[int, int] | None, tuple[int, int] | None]:
+        """Returns the `(total_xp, user_id)` cursors of the first and last user on the page"""
+        if not users_info:
+            return None, None
+        return (users_info[0][3], users_info[0][0]), (users_info[-1][3], users_info[-1][0])
+    
+    async def get_table(self, users_info:list[tuple], page:int = 0) -> str:
         """Creates the table containing a maximum of 20 entrys to display"""
-        database:Main_DB_Controller = self.__bot.database
-        users_info = await database.get_ranks_page_users(guild.id, page)
         table_data = []
-        user_position = page * 1 + 1
+        user_position = page * 20 + 1
 
         # Prepare the data for each table row
+        user_names = await self.__bot.user_resolver.resolve_names([user_info[0] for user_info in users_info])
         for user_info in users_info:
-            user_name = await self.__bot.hybrid_get_user(user_info[0])
+            user_name = user_names[user_info[0]]
             level_experience = calculate_current_level_experience(user_info[1])
             table_data.append((
                 user_position, 
@@ -57,25 +74,61 @@ class Ranks_Command(Base_Cog):
         headers = ["Rank", "Username", "Level", "XP", "Total XP"]
         return tabulate(table_data, headers = headers, tablefmt = "rounded_outline")
     
-    async def get_message_content(self, ctx:discord.Interaction, current_page:int, number_of_pages:int) -> str:
+    async def get_message_content(self, users_info:list[tuple], current_page:int, number_of_pages:int) -> str:
         """Returns the message content for the ranks message (extracted functionality)"""
-        table_content = await self.get_table(ctx.guild, current_page)
+        table_content = await self.get_table(users_info, current_page)
         return (
             f"## Ranks ({current_page + 1} / {number_of_pages})\n"
             f"```{table_content}```"
         )
     
-    def get_view(self, current_page:int, number_of_pages:int) -> discord.ui.View:
-        """Creates a new view with two buttons to change the current page"""
+    async def render_page(self, guild_id:int, current_page:int, number_of_pages:int, cursor:tuple[int, int] | None = None, backwards:bool = False) -> tuple[str, list[tuple]] | None:
+        """Returns the message content and the users of the page, taken from the cache if the experience on the guild has not changed since it was rendered
+
+        While the database is overloaded only a cached page is returned, None if there is none"""
+        async def render() -> tuple[str, list[tuple]]:
+            users_info = await self.get_page_users(guild_id, current_page, cursor, backwards)
+            message_content = await self.get_message_content(users_info, current_page, number_of_pages)
+            hits, misses, hit_rate = self.__page_cache.get_statistics()
+            self._logger.debug(f"Rendered ranks page {current_page} of guild {guild_id} (page cache: {hits} hits, {misses} misses, {hit_rate:.0%} hit rate)")
+            return message_content, users_info
+
+        database:Main_DB_Controller = self.__bot.database
+        version = database.get_experience_version(guild_id)
+        if database.degraded:
+            # Only answer from the cache while the database is overloaded, even if the page is outdated
+            return self.__page_cache.get(guild_id, (current_page, number_of_pages), version, allow_outdated = True)
+        return await self.__page_cache.get_or_render(guild_id, (current_page, number_of_pages), version, render)
+
+    def prefetch_adjacent_pages(self, message_id:int, guild_id:int, current_page:int, number_of_pages:int, users_info:list[tuple]):
+        """Renders the next and previous page in the background, seeking them from the cursors of the page shown"""
+        database:Main_DB_Controller = self.__bot.database
+        if database.degraded:
+            return
+        first_cursor, last_cursor = self.get_page_cursors(users_info)
+        renders = []
+        if current_page < number_of_pages - 1:
+            renders.append(lambda: self.render_page(guild_id, current_page + 1, number_of_pages, last_cursor, False))
+        if current_page > 0:
+            renders.append(lambda: self.render_page(guild_id, current_page - 1, number_of_pages, first_cursor, True))
+        self.__prefetcher.schedule(message_id, renders)
+
+    def get_view(self, current_page:int, number_of_pages:int, users_info:list[tuple]) -> discord.ui.View:
+        """Creates a new view with two buttons to change the current page
+        
+        The target page and the cursor to seek it from are encoded into the custom_id of the buttons, no state is stored in the database"""
+        first_cursor, last_cursor = self.get_page_cursors(users_info)
+        previous_id = Button_Interaction_Handler.build_custom_id("ranks.prev", current_page - 1, *(first_cursor or ()))
+        next_id = Button_Interaction_Handler.build_custom_id("ranks.next", current_page + 1, *(last_cursor or ()))
+
         view = discord.ui.View()
-        view.add_item(discord.ui.Button(style = discord.ButtonStyle.blurple, label = "Previous", custom_id = "ranks.prev", disabled = True if current_page == 0 else False))
-        view.add_item(discord.ui.Button(style = discord.ButtonStyle.blurple, label = "Next", custom_id = "ranks.next", disabled = True if current_page == number_of_pages else False))
+        view.add_item(discord.ui.Button(style = discord.ButtonStyle.blurple, label = "Previous", custom_id = previous_id, disabled = True if current_page == 0 else False))
+        view.add_item(discord.ui.Button(style = discord.ButtonStyle.blurple, label = "Next", custom_id = next_id, disabled = True if current_page >= number_of_pages else False))
         return view
 
     @app_commands.command(name = "ranks", description = "Displays the global decending ranking link for this guild")
     @app_commands.describe(page = "Number of the page you want to display")
     async def ranks(self, ctx:discord.Interaction, page:int = 0):
-        database:Main_DB_Controller = ctx.client.database
         if page < 0:
             await ctx.response.send_message("The page number must be greater than `0`", ephemeral = True)
             return
@@ -84,46 +137,52 @@ class Ranks_Command(Base_Cog):
         
         # Check if the page number is valid
         number_of_pages = await self.get_number_of_rank_pages(ctx.guild_id)
+        if number_of_pages is None:
+            await ctx.response.send_message(self.BUSY_MESSAGE, ephemeral = True)
+            return
         if number_of_pages - 1 < page:
             await ctx.response.send_message(f"Page {page + 1} does not exist, the last page is {number_of_pages}", ephemeral = True)
             return
         
         # Create and send the message for the current page
-        message_content = await self.get_message_content(ctx, page, number_of_pages)
-        view = self.get_view(page, number_of_pages - 1)
+        rendered_page = await self.render_page(ctx.guild_id, page, number_of_pages)
+        if rendered_page is None:
+            await ctx.response.send_message(self.BUSY_MESSAGE, ephemeral = True)
+            return
+        message_content, users_info = rendered_page
+        view = self.get_view(page, number_of_pages - 1, users_info)
         await ctx.response.send_message(message_content, view = view)
-
-        # Modify database
+        # Grouped by the message, like the prefetches of the page turns, so the first turn cancels these
         message = await ctx.original_response()
-        await database.create_ranks_view(message.id, page)
+        self.prefetch_adjacent_pages(message.id, ctx.guild_id, page, number_of_pages, users_info)
 
-    async def callback_previous(self, ctx:discord.Interaction):
-        """Called when a user interacts with the "Previous" button of the "ranks" view"""
-        database:Main_DB_Controller = ctx.client.database
-        next_page = await self.get_next_page_number(ctx.message.id, False)
+    async def change_page(self, ctx:discord.Interaction, backwards:bool, page:str = None, *cursor:str):
+        """Shows the page encoded in the custom_id of the pressed button, seeking it from the encoded cursor"""
+        if page is None:
+            # Views created before the page has been encoded into the custom_id
+            await ctx.response.send_message("This ranking has expired, please use the `/ranks` command again", ephemeral = True)
+            return
+
+        next_page = max(int(page), 0)
         number_of_pages = await self.get_number_of_rank_pages(ctx.guild_id)
 
         # Create and send the message for the current page
-        message_content = await self.get_message_content(ctx, next_page, number_of_pages)
-        view = self.get_view(next_page, number_of_pages - 1)
+        rendered_page = None if number_of_pages is None else await self.render_page(ctx.guild_id, next_page, number_of_pages, tuple(int(value) for value in cursor) or None, backwards)
+        if rendered_page is None:
+            await ctx.response.send_message(self.BUSY_MESSAGE, ephemeral = True)
+            return
+        message_content, users_info = rendered_page
+        view = self.get_view(next_page, number_of_pages - 1, users_info)
         await ctx.response.edit_message(content = message_content, view = view)
+        self.prefetch_adjacent_pages(ctx.message.id, ctx.guild_id, next_page, number_of_pages, users_info)
 
-        # Update database
-        await database.set_ranks_page(ctx.message.id, next_page)
+    async def callback_previous(self, ctx:discord.Interaction, *parameters:str):
+        """Called when a user interacts with the "Previous" button of the "ranks" view"""
+        await self.change_page(ctx, True, *parameters)
 
-    async def callback_next(self, ctx:discord.Interaction):
+    async def callback_next(self, ctx:discord.Interaction, *parameters:str):
         """Called when a user interacts with the "Next" button of the "ranks" view"""
-        database:Main_DB_Controller = ctx.client.database
-        next_page = await self.get_next_page_number(ctx.message.id, True)
-        number_of_pages = await self.get_number_of_rank_pages(ctx.guild_id)
-
-        # Create and send the message for the current page
-        message_content = await self.get_message_content(ctx, next_page, number_of_pages)
-        view = self.get_view(next_page, number_of_pages - 1)
-        await ctx.response.edit_message(content = message_content, view = view)
-
-        # Update database
-        await database.set_ranks_page(ctx.message.id, next_page)
+        await self.change_page(ctx, False, *parameters)
 
     async def cog_load(self):
         Button_Interaction_Handler.link_button_callback("ranks.prev", self)(self.callback_previous)
@@ -133,6 +192,7 @@ class Ranks_Command(Base_Cog):
     async def cog_unload(self):
         Button_Interaction_Handler.unlink_button_callback("ranks.prev")
         Button_Interaction_Handler.unlink_button_callback("ranks.next")
+        self.__prefetcher.cancel_all()
         return await super().cog_unload()
             
 
@@ -15,30 +15,37 @@ class TurnToXP_Command(Base_Cog):
     @app_commands.describe(amount = "Amount of money to be converted, each dollar equals to 5 xp")
     async def command_name(self, ctx:discord.Interaction, amount:int):
         database:Main_DB_Controller = ctx.client.database
-        # Check sufficient balance
-        user_balance = await database.get_user_currency(ctx.guild_id, ctx.user.id)
-        if user_balance is None:
+        # Check for great enougth amount
+        if amount <= 0:
             embed = discord.Embed(
-                description = "You do not have an account balance yet\nCollect your dailymoney or get gifted some",
+                description = "You cannot convert less than `1` :dollar:",
                 color = 0xDB3F2F
             )
             await ctx.response.send_message(embed = embed, ephemeral = True)
             return
-        if user_balance < amount:
-            embed = discord.Embed(
-                description = "Your balance is not sufficient",
-                color = 0xDB3F2F
-            )
+
+        # Substract from user balance, only if it is sufficient, and add the experience. Both are applied together or not at all
+        gained_xp = amount * 5
+        async with database.transaction():
+            remaining_balance = await database.try_debit(ctx.guild_id, ctx.user.id, amount)
+            if remaining_balance is not None:
+                leveled_up, user_lvl, user_xp = await database.add_to_user_experience(ctx.guild_id, ctx.user.id, gained_xp)
+
+        if remaining_balance is None:
+            user_balance = await database.get_user_currency(ctx.guild_id, ctx.user.id)
+            if user_balance is None:
+                embed = discord.Embed(
+                    description = "You do not have an account balance yet\nCollect your dailymoney or get gifted some",
+                    color = 0xDB3F2F
+                )
+            else:
+                embed = discord.Embed(
+                    description = "Your balance is not sufficient",
+                    color = 0xDB3F2F
+                )
             await ctx.response.send_message(embed = embed, ephemeral = True)
             return
-        
-        # Substract from user balance
-        await database.substract_from_user_balance(ctx.guild_id, ctx.user.id, amount)
 
-        # Convert to xp
-        gained_xp = amount * 5
-        leveled_up, user_lvl, user_xp = await database.add_to_user_experience(ctx.guild_id, ctx.user.id, gained_xp)
-        
         # Create and send embed
         embed_description = f"You have successfully converted `{amount}` :dollar: to `{gained_xp}` XP"
         if leveled_up:
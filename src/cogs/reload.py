@@ -8,6 +8,7 @@ from datetime import datetime
 from utils.datetime_tools import get_elapsed_time_milliseconds
 import traceback
 from utils.truncate_str import truncate_message_with_notice
+from utils.database.main_controller import Main_DB_Controller
 
 class Reload_Command(Base_Cog):
     def __init__(self, bot:commands.Bot):
@@ -113,5 +114,32 @@ class Reload_Command(Base_Cog):
             # Clear the cache
             self.__cached_cog_names = None
 
+    @app_commands.command(name = "reload_channels", description = "Reloads the settings of every channel from the database (bot owner only)")
+    async def reload_channels(self, ctx: discord.Interaction):
+        # The settings of all guilds are affected, so only the owner of the bot may reload them
+        if not await self.__bot.is_owner(ctx.user):
+            await ctx.response.send_message("Only the owner of the bot can reload the channel settings", ephemeral = True)
+            return
+
+        await ctx.response.defer(ephemeral = True, thinking = True)
+        task_start = datetime.now().timestamp()
+        database:Main_DB_Controller = self.__bot.database
+        try:
+            await database.reload_channel_settings()
+        except Exception as error:
+            traceback_str = truncate_message_with_notice(traceback.format_exc(), 1800, "\nSee console for more details on the full traceback")
+            await ctx.followup.send(embed = discord.Embed(
+                title = "Reloading Channel Settings",
+                description = f"Reload failed with the following exception:\n```{traceback_str}```",
+                color = 0xED4337), ephemeral = True)
+            raise error
+
+        elapsed_time = get_elapsed_time_milliseconds(datetime.now().timestamp() - task_start)
+        self._logger.info(f"Channel settings successfully reloaded after {elapsed_time}")
+        await ctx.followup.send(embed = discord.Embed(
+            title = "Reloading Channel Settings",
+            description = f"Total time spend: `{elapsed_time}`",
+            color = 0x4BB543), ephemeral = True)
+
 async def setup(bot:commands.Bot):
     await bot.add_cog(Reload_Command(bot))
\ No newline at end of file
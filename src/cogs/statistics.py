@@ -0,0 +1,82 @@
+import discord
+from discord import app_commands
+from discord.ext import commands
+from cogs.base_cog import Base_Cog
+import logging
+from tabulate import tabulate
+from utils.database.main_controller import Main_DB_Controller
+
+class Statistics_Command(Base_Cog):
+    # Number of querys listed, the ones with the most misses first
+    LISTED_QUERYS = 10
+
+    def __init__(self, bot:commands.Bot):
+        self.__bot = bot
+        super().__init__(logging.getLogger("cmds.statistics"))
+
+    async def __check_owner(self, ctx:discord.Interaction) -> bool:
+        """Responds to the interaction and returns `False`, if the user is not the owner of the bot"""
+        if await self.__bot.is_owner(ctx.user):
+            return True
+        embed = discord.Embed(
+            description = "Only the owner of the bot can view the statistics",
+            color = 0xDB3F2F
+        )
+        await ctx.response.send_message(embed = embed, ephemeral = True)
+        return False
+
+    @app_commands.command(name = "database_statistics", description = "Shows the hits and misses on the prepared statements and the usage of the pools (bot owner only)")
+    async def database_statistics(self, ctx:discord.Interaction):
+        if not await self.__check_owner(ctx):
+            return
+
+        database:Main_DB_Controller = self.__bot.database
+        statement_statistics = database.get_statement_statistics()
+        hits = sum(query_hits for query_hits, _ in statement_statistics.values())
+        misses = sum(query_misses for _, query_misses in statement_statistics.values())
+        most_missed = sorted(statement_statistics.items(), key = lambda item: (item[1][1], item[1][0]), reverse = True)[:self.LISTED_QUERYS]
+        statement_table = tabulate(
+            [[query_key, query_hits, query_misses] for query_key, (query_hits, query_misses) in most_missed],
+            headers = ["Query", "Hits", "Misses"], tablefmt = "rounded_outline"
+        )
+        pool_table = tabulate(
+            [
+                [pool_name, f"{size} ({idle_size} idle)", acquisitions, f"{average_wait * 1000:.1f} ms", f"{maximum_wait * 1000:.1f} ms"]
+                for pool_name, (size, idle_size, acquisitions, average_wait, maximum_wait) in database.get_pool_statistics().items()
+            ],
+            headers = ["Pool", "Connections", "Acquired", "Avg. wait", "Max. wait"], tablefmt = "rounded_outline"
+        )
+        hit_rate = hits / (hits + misses) if hits + misses else 0.0
+        embed = discord.Embed(
+            title = "Database Statistics",
+            description = (
+                f"Prepared statements: `{hits}` hits, `{misses}` misses (`{hit_rate:.1%}` hit rate)\n"
+                f"```{statement_table}```\n"
+                f"```{pool_table}```"
+            )
+        )
+        await ctx.response.send_message(embed = embed, ephemeral = True)
+
+    @app_commands.command(name = "queue_statistics", description = "Shows the depth, waiting times and drop counters of the message queue (bot owner only)")
+    async def queue_statistics(self, ctx:discord.Interaction):
+        if not await self.__check_owner(ctx):
+            return
+
+        message_events = self.__bot.get_cog("Message_Events")
+        if message_events is None or message_events.queue is None:
+            await ctx.response.send_message("The message events are not loaded", ephemeral = True)
+            return
+        depth, average_wait, maximum_wait, processed, dropped_low_value, dropped = message_events.queue.get_statistics()
+        embed = discord.Embed(
+            title = "Message Queue Statistics",
+            description = (
+                f"Depth: `{depth}` messages\n"
+                f"Waiting time: `{average_wait * 1000:.1f} ms` on average, `{maximum_wait * 1000:.1f} ms` at most\n"
+                f"Processed: `{processed}` messages\n"
+                f"Dropped: `{dropped_low_value}` of low value, `{dropped}` others"
+            )
+        )
+        await ctx.response.send_message(embed = embed, ephemeral = True)
+
+async def setup(bot:commands.Bot):
+    await bot.add_cog(Statistics_Command(bot))
@@ -0,0 +1,21 @@
+-- Version 1.0
+-- Stores the number of users with a balance and with experience of each guild, kept up to date by the "count_guild_members" trigger
+
+CREATE TABLE "guild_member_count" (
+    "guild_id" BIGINT NOT NULL,
+    "balance_users" INTEGER NOT NULL DEFAULT 0,
+    "level_users" INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY ("guild_id")
+);
+
+-- Creating the triggers locks both tables against writes until the counts are seeded, so no user is missed or counted twice
+CREATE TRIGGER "money_inserted_count" AFTER INSERT ON "money" REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION count_guild_members();
+CREATE TRIGGER "money_deleted_count" AFTER DELETE ON "money" REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION count_guild_members();
+CREATE TRIGGER "user_rank_inserted_count" AFTER INSERT ON "user_rank" REFERENCING NEW TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION count_guild_members();
+CREATE TRIGGER "user_rank_deleted_count" AFTER DELETE ON "user_rank" REFERENCING OLD TABLE AS changed_rows FOR EACH STATEMENT EXECUTE FUNCTION count_guild_members();
+
+INSERT INTO "guild_member_count" ("guild_id", "balance_users", "level_users")
+SELECT COALESCE(balances.guild_id, levels.guild_id), COALESCE(balances.users, 0), COALESCE(levels.users, 0)
+FROM (SELECT guild_id, COUNT(*) AS users FROM money GROUP BY guild_id) AS balances
+FULL OUTER JOIN (SELECT guild_id, COUNT(*) AS users FROM user_rank GROUP BY guild_id) AS levels
+ON balances.guild_id = levels.guild_id;
@@ -0,0 +1,10 @@
+-- Version 1.0
+-- Staging table for the recomputation of all levels, holds the recomputed level and experience of each user until they are applied to "user_rank"
+
+CREATE UNLOGGED TABLE "level_recompute" (
+    "guild_id" BIGINT NOT NULL,
+    "user_id" BIGINT NOT NULL,
+    "total_xp" INTEGER NOT NULL,
+    "level" INTEGER NOT NULL,
+    "xp" INTEGER NOT NULL
+)
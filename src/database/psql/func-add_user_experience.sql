@@ -0,0 +1,37 @@
+-- Version 1.1
+-- Adds experience to a user on a guild and carries over every completed level in a single call
+-- The level is calculated in constant time by level_from_total_experience, from the experience needed to reach the current level plus the experience within it
+
+CREATE OR REPLACE FUNCTION add_user_experience(p_guild_id BIGINT, p_user_id BIGINT, p_experience INTEGER)
+RETURNS TABLE (leveled_up BOOLEAN, new_level INTEGER, new_xp INTEGER) AS $$
+DECLARE
+    v_start_level INTEGER;
+    v_level INTEGER;
+    v_xp INTEGER;
+    v_total BIGINT;
+BEGIN
+    INSERT INTO user_rank (guild_id, user_id, xp, level, total_xp)
+    VALUES (p_guild_id, p_user_id, 0, 0, 0)
+    ON CONFLICT (guild_id, user_id) DO NOTHING;
+
+    SELECT user_rank.level, user_rank.xp
+    INTO v_start_level, v_xp
+    FROM user_rank
+    WHERE user_rank.guild_id = p_guild_id
+    AND user_rank.user_id = p_user_id
+    FOR UPDATE;
+
+    v_total := (10 * v_start_level::BIGINT * v_start_level * v_start_level + 135 * v_start_level::BIGINT * v_start_level + 455 * v_start_level::BIGINT) / 6 + v_xp + p_experience;
+    v_level := level_from_total_experience(v_total);
+    v_xp := v_total - (10 * v_level::BIGINT * v_level * v_level + 135 * v_level::BIGINT * v_level + 455 * v_level::BIGINT) / 6;
+
+    UPDATE user_rank
+    SET xp = v_xp,
+        level = v_level,
+        total_xp = user_rank.total_xp + p_experience
+    WHERE user_rank.guild_id = p_guild_id
+    AND user_rank.user_id = p_user_id;
+
+    RETURN QUERY SELECT v_level > v_start_level, v_level, v_xp;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,41 @@
+-- Version 1.0
+-- Awards the experience for a single message: claims the cooldown, applies the settings of the channel and adds the experience
+-- Returns no row while the user is on cooldown, "experience" is NULL if the channel has no settings and 0 if the message is below the threshold
+
+CREATE OR REPLACE FUNCTION award_message_experience(p_guild_id BIGINT, p_user_id BIGINT, p_channel_id BIGINT, p_message_length INTEGER, p_cooldown DOUBLE PRECISION)
+RETURNS TABLE (experience INTEGER, leveled_up BOOLEAN, new_level INTEGER, new_xp INTEGER) AS $$
+DECLARE
+    v_experience DOUBLE PRECISION;
+    v_minimum_threshold INTEGER;
+    v_maximum_experience INTEGER;
+BEGIN
+    INSERT INTO user_rank (guild_id, user_id)
+    VALUES (p_guild_id, p_user_id)
+    ON CONFLICT (guild_id, user_id)
+    DO UPDATE SET last_xp_pickup = CURRENT_TIMESTAMP
+    WHERE user_rank.last_xp_pickup IS NULL
+    OR user_rank.last_xp_pickup <= CURRENT_TIMESTAMP - make_interval(secs => p_cooldown);
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    SELECT p_message_length * channel_experience.default_multiplier, channel_experience.minimum_threshold, channel_experience.maximum_experience
+    INTO v_experience, v_minimum_threshold, v_maximum_experience
+    FROM channel_experience
+    WHERE channel_experience.channel_id = p_channel_id;
+    IF NOT FOUND THEN
+        RETURN QUERY SELECT NULL::INTEGER, FALSE, NULL::INTEGER, NULL::INTEGER;
+        RETURN;
+    END IF;
+
+    IF v_experience < v_minimum_threshold THEN
+        RETURN QUERY SELECT 0, FALSE, NULL::INTEGER, NULL::INTEGER;
+        RETURN;
+    END IF;
+
+    v_experience := FLOOR(LEAST(v_experience, v_maximum_experience));
+    RETURN QUERY
+    SELECT v_experience::INTEGER, added.leveled_up, added.new_level, added.new_xp
+    FROM add_user_experience(p_guild_id, p_user_id, v_experience::INTEGER) AS added;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,27 @@
+-- Version 1.0
+-- Trigger keeping the number of users with a balance ("money") and with experience ("user_rank") of each guild in "guild_member_count"
+-- Runs once per statement, the rows inserted or deleted by it are passed as the transition table "changed_rows"
+
+CREATE OR REPLACE FUNCTION count_guild_members()
+RETURNS TRIGGER AS $$
+DECLARE
+    v_sign INTEGER := CASE WHEN TG_OP = 'DELETE' THEN -1 ELSE 1 END;
+BEGIN
+    IF TG_TABLE_NAME = 'money' THEN
+        INSERT INTO guild_member_count (guild_id, balance_users)
+        SELECT changed_rows.guild_id, v_sign * COUNT(*)
+        FROM changed_rows
+        GROUP BY changed_rows.guild_id
+        ON CONFLICT (guild_id)
+        DO UPDATE SET balance_users = guild_member_count.balance_users + EXCLUDED.balance_users;
+    ELSE
+        INSERT INTO guild_member_count (guild_id, level_users)
+        SELECT changed_rows.guild_id, v_sign * COUNT(*)
+        FROM changed_rows
+        GROUP BY changed_rows.guild_id
+        ON CONFLICT (guild_id)
+        DO UPDATE SET level_users = guild_member_count.level_users + EXCLUDED.level_users;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
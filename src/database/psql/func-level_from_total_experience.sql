@@ -0,0 +1,29 @@
+-- Version 1.0
+-- Returns the level reached with the given total experience in constant time, the inverse of calculate_total_level_experience (utils/calc_lvl_xp.py)
+-- With x = level + 4.5 the total experience equals (5/3)x^3 - (305/12)x - 37.5, the float estimate for x is corrected with exact integer arithmetic
+
+CREATE OR REPLACE FUNCTION level_from_total_experience(p_total_experience BIGINT)
+RETURNS INTEGER AS $$
+DECLARE
+    v_cube DOUBLE PRECISION;
+    v_x DOUBLE PRECISION;
+    v_level NUMERIC;
+BEGIN
+    IF p_total_experience < 100 THEN
+        RETURN 0;
+    END IF;
+
+    v_cube := 0.6 * (p_total_experience + 37.5);
+    v_x := cbrt(v_cube);
+    v_x := cbrt(v_cube + 15.25 * v_x);
+    v_level := GREATEST(FLOOR(v_x - 4.5)::NUMERIC, 0);
+
+    WHILE 10 * (v_level + 1) * (v_level + 1) * (v_level + 1) + 135 * (v_level + 1) * (v_level + 1) + 455 * (v_level + 1) <= 6 * p_total_experience::NUMERIC LOOP
+        v_level := v_level + 1;
+    END LOOP;
+    WHILE v_level > 0 AND 10 * v_level * v_level * v_level + 135 * v_level * v_level + 455 * v_level > 6 * p_total_experience::NUMERIC LOOP
+        v_level := v_level - 1;
+    END LOOP;
+    RETURN v_level::INTEGER;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
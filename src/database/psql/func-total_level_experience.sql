@@ -0,0 +1,7 @@
+-- Version 1.0
+-- Returns the total experience required to reach (not complete) a level, the same as calculate_total_level_experience (utils/calc_lvl_xp.py)
+
+CREATE OR REPLACE FUNCTION total_level_experience(p_level INTEGER)
+RETURNS BIGINT AS $$
+    SELECT (10 * p_level::BIGINT * p_level * p_level + 135 * p_level::BIGINT * p_level + 455 * p_level::BIGINT) / 6;
+$$ LANGUAGE sql IMMUTABLE;
@@ -0,0 +1,5 @@
+-- Version 1.0
+-- Used to seek through the leaderboard pages of a guild, without sorting the whole guild
+-- Created on every start, so it also reaches the databases whose money table existed before the index was added
+
+CREATE INDEX IF NOT EXISTS "money_guild_balance" ON "money" ("guild_id", "balance" DESC, "user_id" DESC);
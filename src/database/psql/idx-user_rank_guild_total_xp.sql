@@ -0,0 +1,5 @@
+-- Version 1.0
+-- Used to determine the position of a user within a guild and to seek through the ranks pages, without sorting the whole guild
+-- Created on every start, so it also reaches the databases whose user_rank table existed before the index was added
+
+CREATE INDEX IF NOT EXISTS "user_rank_guild_total_xp" ON "user_rank" ("guild_id", "total_xp" DESC, "user_id" DESC);
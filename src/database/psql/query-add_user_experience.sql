@@ -0,0 +1,5 @@
+-- Version 1.0
+-- Adds to the user's experience on a specific guild and levels the user up, if enough experience has been gained
+
+SELECT leveled_up, new_level, new_xp
+FROM add_user_experience($1, $2, $3)
@@ -0,0 +1,17 @@
+-- Version 1.0
+-- Applies the recomputed levels from the staging table in one statement, returns the number of changed users
+-- Users whose total experience changed since it was read are skipped, their values are not overwritten with stale ones
+
+WITH updated AS (
+    UPDATE user_rank
+    SET level = level_recompute.level,
+        xp = level_recompute.xp
+    FROM level_recompute
+    WHERE user_rank.guild_id = level_recompute.guild_id
+    AND user_rank.user_id = level_recompute.user_id
+    AND user_rank.total_xp = level_recompute.total_xp
+    AND (user_rank.level <> level_recompute.level OR user_rank.xp <> level_recompute.xp)
+    RETURNING 1
+)
+SELECT COUNT(*) AS count
+FROM updated
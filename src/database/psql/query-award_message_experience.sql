@@ -0,0 +1,5 @@
+-- Version 1.0
+-- Awards the experience for a message, see the award_message_experience function
+
+SELECT experience, leveled_up, new_level, new_xp
+FROM award_message_experience($1, $2, $3, $4, $5)
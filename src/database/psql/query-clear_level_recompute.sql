@@ -0,0 +1,4 @@
+-- Version 1.0
+-- Removes all rows from the staging table of the level recomputation
+
+DELETE FROM level_recompute
@@ -0,0 +1,5 @@
+-- Version 1.0
+-- Counts the users with experience over all guilds
+
+SELECT COUNT(*) AS count
+FROM user_rank
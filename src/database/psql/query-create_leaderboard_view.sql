@@ -1,5 +0,0 @@
--- Version 1.0
--- Creates a page in the table, to perform scroll actions on interaction
-
-INSERT INTO btn_leaderboard (message_id, current_page)
-VALUES ($1, $2)
\ No newline at end of file
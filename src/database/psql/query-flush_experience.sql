@@ -0,0 +1,12 @@
+-- Version 2.0
+-- Writes the experience accumulated by the experience buffer for many users at once, each argument is an array with one element per user
+-- Only the gained experience is sent, the level and the experience within it are calculated from the merged total experience, so changes made meanwhile are kept
+
+INSERT INTO user_rank (guild_id, user_id, xp, level, total_xp)
+SELECT added.guild_id, added.user_id, added.experience - total_level_experience(reached.level), reached.level, added.experience
+FROM unnest($1::BIGINT[], $2::BIGINT[], $3::INTEGER[]) AS added (guild_id, user_id, experience)
+CROSS JOIN LATERAL (SELECT level_from_total_experience(added.experience) AS level) AS reached
+ON CONFLICT (guild_id, user_id)
+DO UPDATE SET level = level_from_total_experience(user_rank.total_xp + EXCLUDED.total_xp),
+              xp = user_rank.total_xp + EXCLUDED.total_xp - total_level_experience(level_from_total_experience(user_rank.total_xp + EXCLUDED.total_xp)),
+              total_xp = user_rank.total_xp + EXCLUDED.total_xp
@@ -0,0 +1,5 @@
+-- Version 1.0
+-- Selects the enabled functionality of every channel, to load them into the channel settings cache
+
+SELECT channel_id, experience, pick_money
+FROM event_message
@@ -0,0 +1,5 @@
+-- Version 1.0
+-- Selects the applied settings regarding the gain of experience of every channel, to load them into the channel settings cache
+
+SELECT channel_id, default_multiplier, minimum_threshold, maximum_experience
+FROM channel_experience
@@ -0,0 +1,5 @@
+-- Version 1.0
+-- Selects the applied settings regarding random apperance of pick money of every channel, to load them into the channel settings cache
+
+SELECT channel_id, min_amount, max_amount, probability
+FROM channel_pick_money
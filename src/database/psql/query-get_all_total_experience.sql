@@ -0,0 +1,5 @@
+-- Version 1.0
+-- Retrieves the total experience of every user on every guild, used to recompute all levels
+
+SELECT guild_id, user_id, total_xp
+FROM user_rank
@@ -0,0 +1,5 @@
+-- Version 1.0
+-- Gets the number of users with a balance and with experience on a certain guild, as maintained by the "count_guild_members" trigger
+SELECT balance_users, level_users
+FROM guild_member_count
+WHERE guild_id = $1;
@@ -1,17 +1,13 @@
--- Version 1.0
+-- Version 2.0
 -- Calculates the position a user has in the ranking list within a guild
+-- Counts the users with more total experience using the (guild_id, total_xp) index, ties share the same position like RANK() does
 
-SELECT rank - 1 AS user_rank
-FROM (
-    SELECT
-        "user_id",
-        "guild_id",
-        "total_xp",
-        RANK() OVER (
-            PARTITION BY "guild_id" 
-            ORDER BY "total_xp" DESC
-        ) AS rank
-    FROM "user_rank"
-) ranked
-WHERE "guild_id" = $1
-  AND "user_id" = $2;
\ No newline at end of file
+SELECT (
+    SELECT COUNT(*)
+    FROM "user_rank" AS "other"
+    WHERE "other"."guild_id" = $1
+      AND "other"."total_xp" > "target"."total_xp"
+) AS user_rank
+FROM "user_rank" AS "target"
+WHERE "target"."guild_id" = $1
+  AND "target"."user_id" = $2;
@@ -1,8 +1,8 @@
--- Version 1.0
+-- Version 1.1
 -- Get users with experience on the specified guild
 
 SELECT user_id, level, xp, total_xp
 FROM user_rank
 WHERE guild_id = $1
-ORDER BY total_xp DESC
-LIMIT $2 OFFSET $3;
\ No newline at end of file
+ORDER BY total_xp DESC, user_id DESC
+LIMIT $2 OFFSET $3;
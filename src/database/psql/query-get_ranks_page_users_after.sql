@@ -0,0 +1,9 @@
+-- Version 1.0
+-- Get the users following the provided (total_xp, user_id) cursor, seeking through the (guild_id, total_xp, user_id) index
+
+SELECT user_id, level, xp, total_xp
+FROM user_rank
+WHERE guild_id = $1
+AND (total_xp, user_id) < ($2, $3)
+ORDER BY total_xp DESC, user_id DESC
+LIMIT $4;
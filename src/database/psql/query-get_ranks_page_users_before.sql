@@ -0,0 +1,9 @@
+-- Version 1.0
+-- Get the users preceding the provided (total_xp, user_id) cursor, in reversed order
+
+SELECT user_id, level, xp, total_xp
+FROM user_rank
+WHERE guild_id = $1
+AND (total_xp, user_id) > ($2, $3)
+ORDER BY total_xp ASC, user_id ASC
+LIMIT $4;
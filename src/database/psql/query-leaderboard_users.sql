@@ -1,7 +1,7 @@
--- Version 1.0
+-- Version 1.1
 -- Get nine users on the current page
 SELECT user_id, balance
 FROM money
 WHERE guild_id = $1
-ORDER BY balance DESC
+ORDER BY balance DESC, user_id DESC
 LIMIT $2 OFFSET $3;
@@ -0,0 +1,9 @@
+-- Version 1.0
+-- Get the users following the provided (balance, user_id) cursor, seeking through the (guild_id, balance, user_id) index
+
+SELECT user_id, balance
+FROM money
+WHERE guild_id = $1
+AND (balance, user_id) < ($2, $3)
+ORDER BY balance DESC, user_id DESC
+LIMIT $4;
@@ -0,0 +1,9 @@
+-- Version 1.0
+-- Get the users preceding the provided (balance, user_id) cursor, in reversed order
+
+SELECT user_id, balance
+FROM money
+WHERE guild_id = $1
+AND (balance, user_id) > ($2, $3)
+ORDER BY balance ASC, user_id ASC
+LIMIT $4;
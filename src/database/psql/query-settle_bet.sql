@@ -0,0 +1,10 @@
+-- Version 1.0
+-- Takes the bet ($3) from a specified user and credits the payout ($4) in one step, but only if the balance covers the bet. Returns the new balance, or no row if nothing was settled
+
+UPDATE money
+SET balance = balance - $3 + $4
+WHERE guild_id = $1
+AND user_id = $2
+AND balance >= $3
+AND $3 >= 0
+RETURNING balance
@@ -0,0 +1,10 @@
+-- Version 1.0
+-- Substracts a specified amount from a specified user, but only if the balance is sufficient. Returns the new balance, or no row if nothing was substracted
+
+UPDATE money
+SET balance = balance - $3
+WHERE guild_id = $1
+AND user_id = $2
+AND balance >= $3
+AND $3 >= 0
+RETURNING balance
@@ -1,6 +0,0 @@
--- Version 1.0
--- Update the current page, to match the content of the message
-
-UPDATE btn_leaderboard
-SET current_page = $1
-WHERE message_id = $2
\ No newline at end of file
@@ -1,13 +1,57 @@
-import math
+from bisect import bisect_right
+from typing import Iterable
 
 def calculate_current_level_experience(current_level:int) -> int:
     """Calculates the amount of experience required to complete this level"""
-    return int(5 * math.pow(current_level, 2) + 50 * current_level + 100)
+    return 5 * current_level * current_level + 50 * current_level + 100
 
 def calculate_total_level_experience(target_level:int) -> int:
-    """Calculates the total XP required to reach (not complete) a certain level"""
+    """Calculates the total XP required to reach (not complete) a certain level
+
+    Sum of the experience of all previous levels, (5/3)L³ + (45/2)L² + (455/6)L, which is an integer for every level"""
     if target_level <= 0:
         return 0
-    return int((5 / 3) * math.pow(target_level, 3) + 
-               (45 / 2) * math.pow(target_level, 2) + 
-               (455 / 6) * target_level)
\ No newline at end of file
+    return (10 * target_level ** 3 + 135 * target_level ** 2 + 455 * target_level) // 6
+
+def level_from_total_xp(total_xp:int) -> int:
+    """Calculates the level reached with the given total XP, the inverse of `calculate_total_level_experience`
+
+    Runs in constant time: With x = level + 4.5 the total XP equals (5/3)x³ - (305/12)x - 37.5, which is solved for x as a float.
+    The estimate is then corrected with exact integer arithmetic, so the result is exact"""
+    if total_xp < calculate_current_level_experience(0):
+        return 0
+    cube = 0.6 * (total_xp + 37.5)
+    x = cube ** (1 / 3)
+    # One fixed point step accounts for the linear term
+    x = (cube + 15.25 * x) ** (1 / 3)
+    level = max(int(x - 4.5), 0)
+
+    while calculate_total_level_experience(level + 1) <= total_xp:
+        level += 1
+    while level > 0 and calculate_total_level_experience(level) > total_xp:
+        level -= 1
+    return level
+
+def split_total_xp(total_xp:int) -> tuple[int, int]:
+    """Returns the level reached with the given total XP, aswell as the experience gained within that level"""
+    level = level_from_total_xp(total_xp)
+    return level, total_xp - calculate_total_level_experience(level)
+
+def split_total_xps(total_xps:Iterable[int]) -> list[tuple[int, int]]:
+    """Bulk variant of `split_total_xp`, e.g. to recompute the levels of all users
+
+    The total XP needed for each level up to the highest one is calculated once, every value is then looked up by binary search"""
+    total_xps = list(total_xps)
+    if not total_xps:
+        return []
+    # Index i holds the total XP needed to reach level i + 1
+    thresholds = [calculate_total_level_experience(level) for level in range(1, level_from_total_xp(max(total_xps)) + 2)]
+    levels = []
+    for total_xp in total_xps:
+        level = bisect_right(thresholds, total_xp)
+        levels.append((level, total_xp - thresholds[level - 1] if level else total_xp))
+    return levels
+
+def levels_from_total_xp(total_xps:Iterable[int]) -> list[int]:
+    """Calculates the level for many total XP values at once"""
+    return [level for level, _ in split_total_xps(total_xps)]
\ No newline at end of file
@@ -0,0 +1,95 @@
+from array import array
+import math
+from time import monotonic
+
+class Cooldown_Tracker:
+    """Bounded, array backed hash table remembering which `(guild_id, user_id)` pairs are on cooldown
+
+    The table never grows: Each slot takes 20 bytes (two 64 bit ids and a 32 bit expiry in seconds). The default of 2^17 slots uses about 2.6 MB,
+    tracking one million users being active within the same cooldown window (load factor below 0.5) requires 2^21 slots, about 40 MB.
+    Expired slots are reused in place, if a probe window is full the entry expiring first is evicted.
+
+    The tracker only answers "on cooldown" for pairs it has recorded itself and at most a second longer than the cooldown,
+    an evicted or forgotten pair is reported as ready. It is meant to avoid database round trips, not to replace the check done there"""
+    PROBE_LENGTH = 8
+
+    def __init__(self, cooldown:float = 60.0, capacity:int = 2 ** 17):
+        if capacity <= 0 or capacity & (capacity - 1):
+            raise ValueError(f"capacity must be a power of two, not '{capacity}'")
+        self.__cooldown = cooldown
+        self.__mask = capacity - 1
+        self.__start = monotonic()
+        self.__guild_ids = array("Q", bytes(8 * capacity))
+        self.__user_ids = array("Q", bytes(8 * capacity))
+        # Second (relative to the creation of the tracker) at which the cooldown ends, 0 marks a slot as never used
+        self.__expires = array("I", bytes(4 * capacity))
+
+    def __now(self) -> int:
+        # Started seconds are truncated and the expiry is rounded up, so the cooldown rather ends up to a second too late than too early
+        return int(monotonic() - self.__start)
+
+    def __find_slot(self, guild_id:int, user_id:int, now:int) -> tuple[int, bool]:
+        """Returns the slot to record the pair in and whether the pair is still on cooldown"""
+        guild_ids, user_ids, expires, mask = self.__guild_ids, self.__user_ids, self.__expires, self.__mask
+        index = hash((guild_id, user_id)) & mask
+        free_slot = -1
+        oldest_slot = index
+
+        for offset in range(self.PROBE_LENGTH):
+            slot = (index + offset) & mask
+            expiry = expires[slot]
+            if expiry == 0:
+                # The pair was never recorded further along the probe window
+                if free_slot == -1:
+                    free_slot = slot
+                break
+            if guild_ids[slot] == guild_id and user_ids[slot] == user_id:
+                return slot, expiry > now
+            if expiry <= now and free_slot == -1:
+                free_slot = slot
+            if expiry < expires[oldest_slot]:
+                oldest_slot = slot
+
+        if free_slot == -1:
+            free_slot = oldest_slot
+        return free_slot, False
+
+    def __record(self, slot:int, guild_id:int, user_id:int):
+        self.__guild_ids[slot] = guild_id
+        self.__user_ids[slot] = user_id
+        self.__expires[slot] = math.ceil(monotonic() - self.__start + self.__cooldown)
+
+    def try_claim(self, guild_id:int, user_id:int) -> bool:
+        """Returns `False` if the user is still on cooldown. Otherwise the cooldown is started and `True` is returned
+
+        Only to be used if the tracker is the only cooldown applied, otherwise see `start_cooldown`"""
+        slot, on_cooldown = self.__find_slot(guild_id, user_id, self.__now())
+        if on_cooldown:
+            return False
+        self.__record(slot, guild_id, user_id)
+        return True
+
+    def start_cooldown(self, guild_id:int, user_id:int):
+        """Starts (or restarts) the cooldown of the user, after another authority (e.g. the database) has confirmed the claim
+
+        Arming the tracker only after the confirmation keeps it from running out of sync with that authority, like locking out a user
+        whose claim has been refused there"""
+        slot, _ = self.__find_slot(guild_id, user_id, self.__now())
+        self.__record(slot, guild_id, user_id)
+
+    def is_on_cooldown(self, guild_id:int, user_id:int) -> bool:
+        """Returns `True` if the user is known to be on cooldown, without claiming it"""
+        now = self.__now()
+        index = hash((guild_id, user_id)) & self.__mask
+        for offset in range(self.PROBE_LENGTH):
+            slot = (index + offset) & self.__mask
+            expiry = self.__expires[slot]
+            if expiry == 0:
+                return False
+            if self.__guild_ids[slot] == guild_id and self.__user_ids[slot] == user_id:
+                return expiry > now
+        return False
+
+    def memory_usage(self) -> int:
+        """Returns the number of bytes used by the slot arrays"""
+        return sum(values.itemsize * len(values) for values in (self.__guild_ids, self.__user_ids, self.__expires))
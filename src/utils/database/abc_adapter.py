@@ -4,6 +4,8 @@ from datetime import datetime
 import logging
 from utils.datetime_tools import get_elapsed_time_milliseconds
 from os import listdir
+from contextlib import AbstractAsyncContextManager, AbstractContextManager
+from typing import AsyncIterator, Awaitable, Callable, Iterable
 
 class DatabaseAdapter(ABC):
     """Abstract class to ease the addition and integration of new database systems.
@@ -13,8 +15,10 @@ class DatabaseAdapter(ABC):
     SQL_TOP_FOLDER_NAME = "database"
     DATA_DEFINITION_FILE_PREFIX = "ddl-"
     QUERY_FILE_PREFIX = "query-"
+    ROUTINE_FILE_PREFIX = "func-"
+    INDEX_FILE_PREFIX = "idx-"
 
-    VERSION = "2.2"
+    VERSION = "2.6"
     number_of_instances = 0
 
     def __init__(self, database_type:str, top_path:str):
@@ -33,11 +37,15 @@ class DatabaseAdapter(ABC):
         db_files = self.load_all_files()
         no_of_querys = len(db_files["query"])
         no_of_tables = len(db_files["table"])
-        self._logger.info(f"Loaded {no_of_querys} query and {no_of_tables} table define executable, after {get_elapsed_time_milliseconds(datetime.now().timestamp() - begin_load)}")
+        no_of_routines = len(db_files["routine"])
+        no_of_indexes = len(db_files["index"])
+        self._logger.info(f"Loaded {no_of_querys} query, {no_of_tables} table define, {no_of_routines} routine define and {no_of_indexes} index define executable, after {get_elapsed_time_milliseconds(datetime.now().timestamp() - begin_load)}")
 
         # Save the known querys
         self._querys = db_files["query"]
         self._ddls = db_files["table"]
+        self._routines = db_files["routine"]
+        self._indexes = db_files["index"]
 
     def get_type(self) -> str:
         return self._type
@@ -50,15 +58,49 @@ class DatabaseAdapter(ABC):
         """Method to execute a normal query, returns a tuple with the retrieved values"""
         pass
 
+    @abstractmethod
+    def session(self, transaction:bool = False) -> AbstractAsyncContextManager:
+        """Returns an async context manager, binding a single connection to every query executed within its block
+
+        If `transaction` is `True`, the block is executed as one transaction and rolled back if an exception is raised.
+        Nested sessions reuse the already bound connection, nested transactions are executed as savepoints"""
+        pass
+
+    def transaction(self) -> AbstractAsyncContextManager:
+        """Shorthand for a `session` executed as one transaction"""
+        return self.session(transaction = True)
+
+    @abstractmethod
+    def use_pool(self, pool_name:str) -> AbstractContextManager:
+        """Returns a context manager, taking the connections for all querys executed within its block (and tasks created in it) from the named pool
+
+        Separate pools keep one class of workload (e.g. `background`) from exhausting the connections of another (e.g. `interactive`)"""
+        pass
+
     # @abstractmethod
     # async def execute_dict_query(self, query_key:str, arguments: tuple = ()) -> dict:
     #     """Method to execute a query in dictionary mode, returns a tuple with the retrieved data assigned to a key (same as column name)"""
     #     pass
 
-    # @abstractmethod
-    # def insert_many(self, query_key:str, arguments: list) -> None:
-    #     """Method to insert many values into the database, the argument list contains tuples with the values that should be inserted"""
-    #     pass
+    @abstractmethod
+    async def execute_many(self, query_key:str, arguments:Iterable[tuple]) -> int:
+        """Method to execute a query once for every tuple of arguments in a single batch, returns the number of executions"""
+        pass
+
+    @abstractmethod
+    def fetch_batches(self, query_key:str, arguments:tuple = (), batch_size:int = 10000) -> AsyncIterator[list]:
+        """Method to stream the result of a query in batches of `batch_size` rows, without loading the whole result into memory"""
+        pass
+
+    @abstractmethod
+    async def copy_in(self, table_name:str, records:Iterable[tuple], columns:list[str] = None) -> int:
+        """Method to bulk load the records into the table, using the fastest path the database system offers. Returns the number of rows written"""
+        pass
+
+    @abstractmethod
+    async def copy_out(self, query_key:str, output:Callable[[bytes], Awaitable], arguments:tuple = (), format:str = "csv") -> int:
+        """Method to stream the result of a query, `output` is awaited with every chunk of data as it arrives. Returns the number of rows read"""
+        pass
 
     # @abstractmethod
     # def commit_changes(self):
@@ -75,11 +117,50 @@ class DatabaseAdapter(ABC):
     #     """Returns the number of defined querys"""
     #     pass
 
+    @abstractmethod
+    def get_load(self, window:float = 10.0) -> tuple[float, float]:
+        """Method to return the 95th percentile of the query latency and of the time waited for a connection (both in seconds), within the last `window` seconds"""
+        pass
+
+    @abstractmethod
+    def get_statement_statistics(self) -> dict[str, tuple[int, int]]:
+        """Method to return the number of hits and misses on the prepared statements, indexed by the query key"""
+        pass
+
+    @abstractmethod
+    def get_pool_statistics(self) -> dict[str, tuple[int, int, int, float, float]]:
+        """Method to return the number of open and idle connections, the number of acquisitions aswell as the average and maximum time (in seconds)
+        waited for a connection, indexed by the name of the pool"""
+        pass
+
+    def log_statistics(self):
+        """Helpermethod to log the statistics of the prepared statements and the pools, e.g. before the connection is closed"""
+        statement_statistics = self.get_statement_statistics()
+        hits = sum(query_hits for query_hits, _ in statement_statistics.values())
+        misses = sum(query_misses for _, query_misses in statement_statistics.values())
+        hit_rate = hits / (hits + misses) if hits + misses else 0.0
+        self._logger.info(f"Prepared statements: {hits} hits, {misses} misses ({hit_rate:.1%} hit rate)")
+        for query_key, (query_hits, query_misses) in sorted(statement_statistics.items(), key = lambda item: item[1][1], reverse = True):
+            if query_misses:
+                self._logger.debug(f"Prepared statement {query_key}: {query_hits} hits, {query_misses} misses")
+        for pool_name, (size, idle_size, acquisitions, average_wait, maximum_wait) in self.get_pool_statistics().items():
+            self._logger.info(f"Pool {pool_name}: {size} connections ({idle_size} idle), {acquisitions} acquisitions, waited {get_elapsed_time_milliseconds(average_wait)} on average and {get_elapsed_time_milliseconds(maximum_wait)} at most")
+
     @abstractmethod
     def _check_table(self, table_name: str, create_statement: str):
         """Internal abstract method to check if the given table does exist. If it doesnt, the `create_statement` is executed to create it"""
         pass
 
+    @abstractmethod
+    async def _create_routine(self, routine_name: str, create_statement: str):
+        """Internal abstract method to create (or replace) the given server side routine by executing the `create_statement`"""
+        pass
+
+    @abstractmethod
+    async def _create_index(self, index_name: str, create_statement: str):
+        """Internal abstract method to create the given index if it does not exist yet, by executing the `create_statement`"""
+        pass
+
     @abstractmethod
     def close_connection(self):
         """Method to close the connection to the database properly"""
@@ -93,6 +174,12 @@ class DatabaseAdapter(ABC):
     # def stop_routine(self):
     #     """Method that is ran before the database connection is closed"""
 
+    def _log_throughput(self, operation:str, target:str, rows:int, begin:float):
+        """Helpermethod to log the number of rows processed by a bulk operation, aswell as the achieved rows per second"""
+        elapsed = datetime.now().timestamp() - begin
+        rows_per_second = rows / elapsed if elapsed > 0 else float("inf")
+        self._logger.info(f"{operation} {rows} rows ({target}) after {get_elapsed_time_milliseconds(elapsed)} ({rows_per_second:.0f} rows/s)")
+
     def _open_when_starting_with(self, file_name:str, file_prefix:str, remove_breaklines:bool = True, remove_comments:bool = True):
         """Helpermethod to check if the specified file starts with the given prefix, load it if it does so.
         
@@ -146,6 +233,30 @@ class DatabaseAdapter(ABC):
             await self._check_table(table_name, self._ddls[table_name])
         self._logger.info(f"Checked the existence of all specified tables after {get_elapsed_time_milliseconds(datetime.now().timestamp() - begin_check)}")
 
+    async def create_routines(self, routine_names:list[str] = None):
+        """Abstract helpermethod to create or replace all the server side routines (functions) used by the querys"""
+        if not routine_names:
+            routine_names = self._routines.keys()
+
+        self._logger.debug("Creating all specified routines ...")
+        begin_create = datetime.now().timestamp()
+        for routine_name in routine_names:
+            await self._create_routine(routine_name, self._routines[routine_name])
+        self._logger.info(f"Created all specified routines after {get_elapsed_time_milliseconds(datetime.now().timestamp() - begin_create)}")
+
+    async def create_indexes(self, index_names:list[str] = None):
+        """Abstract helpermethod to create all the indexes used by the querys, which do not exist yet
+
+        Unlike the tables, the indexes are created on every start, so those added later also reach existing databases"""
+        if not index_names:
+            index_names = self._indexes.keys()
+
+        self._logger.debug("Creating all specified indexes ...")
+        begin_create = datetime.now().timestamp()
+        for index_name in index_names:
+            await self._create_index(index_name, self._indexes[index_name])
+        self._logger.info(f"Created all specified indexes after {get_elapsed_time_milliseconds(datetime.now().timestamp() - begin_create)}")
+
     def list_files(self) -> list[str]:
         """Method to list all files in the folder of the database system"""
         file_names = []
@@ -210,11 +321,13 @@ class DatabaseAdapter(ABC):
     def load_all_files(self, debug_mode_enabled:bool = True) -> dict:
         """Method to load all files for the database including those to create tables and execute querys.
         
-        The dictionary has two top level keys `table` and `query`, containing another dictionary with the filename (file prefix removes) being the key and the value the file content"""
+        The dictionary has four top level keys `table`, `query`, `routine` and `index`, containing another dictionary with the filename (file prefix removes) being the key and the value the file content"""
         files = self.list_files()
         db_files = {
             "table": {},
-            "query": {}
+            "query": {},
+            "routine": {},
+            "index": {}
         }
 
         if debug_mode_enabled:
@@ -239,6 +352,18 @@ class DatabaseAdapter(ABC):
                     db_files["table"][returned[0]] = returned[1]
                 
                 else:
-                    print("Ingored", file_name, "since no prefix matches")
+                    returned = self._open_when_starting_with(file_name, DatabaseAdapter.ROUTINE_FILE_PREFIX, optimize, optimize)
+
+                    if returned:
+                        db_files["routine"][returned[0]] = returned[1]
+
+                    else:
+                        returned = self._open_when_starting_with(file_name, DatabaseAdapter.INDEX_FILE_PREFIX, optimize, optimize)
+
+                        if returned:
+                            db_files["index"][returned[0]] = returned[1]
+
+                        else:
+                            print("Ingored", file_name, "since no prefix matches")
 
         return db_files
\ No newline at end of file
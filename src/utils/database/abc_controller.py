@@ -1,10 +1,11 @@
 from abc import ABC
+from contextlib import AbstractAsyncContextManager, AbstractContextManager
 from utils.database.abc_adapter import DatabaseAdapter
 import logging
 
 class DatabaseController(ABC):
     """Controllerclass to make use of the adapters"""
-    VERSION = "2.2"
+    VERSION = "2.3"
     number_of_instances = 0
 
     def __init__(self, database_adapter: DatabaseAdapter) -> None:
@@ -21,4 +22,16 @@ class DatabaseController(ABC):
         """Shuts the connected adapter down"""
         self._adapter.close_connection()
 
+    def session(self, transaction:bool = False) -> AbstractAsyncContextManager:
+        """Binds a single connection to all controller calls made within the block, see `DatabaseAdapter.session`"""
+        return self._adapter.session(transaction)
+
+    def transaction(self) -> AbstractAsyncContextManager:
+        """Executes all controller calls made within the block in one transaction, see `DatabaseAdapter.transaction`"""
+        return self._adapter.transaction()
+
+    def use_pool(self, pool_name:str) -> AbstractContextManager:
+        """Takes the connections of all controller calls made within the block from the named pool, see `DatabaseAdapter.use_pool`"""
+        return self._adapter.use_pool(pool_name)
+
     
\ No newline at end of file
@@ -0,0 +1,53 @@
+import logging
+
+class Channel_Settings_Cache:
+    """Keeps the enabled functionality and the settings of every configured channel in memory
+
+    Once loaded, the cache is complete: A channel missing from it has nothing configured, so no query is needed to find that out.
+    Every write to the cached tables must update the cache aswell, until then the previous value is returned.
+    Changes made outside of the bot are only picked up when the cache is loaded again"""
+    def __init__(self):
+        self.__logger = logging.getLogger("utils.dbc.channels")
+        self.__loaded = False
+        self.__functionality:dict[int, tuple[bool, bool]] = {}
+        self.__experience_settings:dict[int, tuple[float, int, int]] = {}
+        self.__pick_money_settings:dict[int, tuple[int, int, int]] = {}
+        # Channels whose experience settings have been written while the cache is being reloaded, None if no reload is running
+        self.__written_during_reload:set[int] | None = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the cache has been loaded and can answer lookups on its own"""
+        return self.__loaded
+
+    def begin_reload(self):
+        """Called before the settings to `load` are read from the database, so the writes made meanwhile are not overwritten by them"""
+        self.__written_during_reload = set()
+
+    def load(self, functionality:dict[int, tuple[bool, bool]], experience_settings:dict[int, tuple[float, int, int]], pick_money_settings:dict[int, tuple[int, int, int]]):
+        """Replaces the content of the cache with the provided settings, indexed by the channel id"""
+        if self.__written_during_reload:
+            # The provided settings might have been read before these writes, the cached values are newer
+            for channel_id in self.__written_during_reload:
+                experience_settings[channel_id] = self.__experience_settings[channel_id]
+        self.__written_during_reload = None
+        self.__functionality = functionality
+        self.__experience_settings = experience_settings
+        self.__pick_money_settings = pick_money_settings
+        self.__loaded = True
+        self.__logger.info(f"Loaded the settings of {len(functionality)} channels ({len(experience_settings)} experience, {len(pick_money_settings)} pick money)")
+
+    def get_functionality(self, channel_id:int) -> tuple[bool, bool] | None:
+        return self.__functionality.get(channel_id)
+
+    def get_experience_settings(self, channel_id:int) -> tuple[float, int, int] | None:
+        return self.__experience_settings.get(channel_id)
+
+    def get_pick_money_settings(self, channel_id:int) -> tuple[int, int, int] | None:
+        return self.__pick_money_settings.get(channel_id)
+
+    def set_experience_settings(self, channel_id:int, default_multiplier:float, minimum_threshold:int, maximum_experience:int):
+        """Updates the cached experience settings of the channel, after they have been written to the database"""
+        self.__experience_settings[channel_id] = (default_multiplier, minimum_threshold, maximum_experience)
+        if self.__written_during_reload is not None:
+            self.__written_during_reload.add(channel_id)
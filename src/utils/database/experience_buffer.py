@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from datetime import datetime
+from utils.database.abc_adapter import DatabaseAdapter
+from utils.calc_lvl_xp import calculate_total_level_experience, split_total_xp
+from utils.datetime_tools import get_elapsed_time_milliseconds
+
+class Experience_Buffer:
+    """Accumulates the experience gained by users in memory and writes it to the database in bulk (write-behind)
+
+    The level and experience of each buffered user are kept in memory, so level ups are detected when the experience is added.
+    The buffer is flushed every `flush_interval` seconds, or as soon as it holds `max_entries` users, using a single statement"""
+    def __init__(self, database_adapter:DatabaseAdapter, flush_interval:float = 10.0, max_entries:int = 1000):
+        self.__adapter = database_adapter
+        self.__flush_interval = flush_interval
+        self.__max_entries = max_entries
+        self.__logger = logging.getLogger("utils.dbc.xpbuffer")
+
+        # Indexed by (guild_id, user_id), each entry holds [level, xp, experience not written to the database yet]
+        self.__entries:dict[tuple[int, int], list[int]] = {}
+        # Entries currently being written, they are the base for experience added during the flush
+        self.__flushing:dict[tuple[int, int], list[int]] = {}
+        # Incremented with every flush, to detect database reads that might have raced with it
+        self.__generation = 0
+        self.__flush_lock = asyncio.Lock()
+        self.__flush_task:asyncio.Task | None = None
+        self.__periodic_task:asyncio.Task | None = None
+
+    def start(self):
+        """Starts flushing the buffer periodically"""
+        self.__periodic_task = asyncio.create_task(self.__flush_periodically())
+        self.__logger.info(f"Experience buffer started, flushing every {self.__flush_interval} seconds or at {self.__max_entries} users")
+
+    async def stop(self):
+        """Stops the periodic flush and writes everything still buffered to the database"""
+        tasks = [task for task in (self.__periodic_task, self.__flush_task) if task is not None]
+        if self.__periodic_task is not None:
+            self.__periodic_task.cancel()
+        self.__periodic_task = self.__flush_task = None
+        # A flush still running finishes writing its batch (or puts it back into the buffer) first
+        await asyncio.gather(*tasks, return_exceptions = True)
+        await self.flush()
+
+    def peek(self, guild_id:int, user_id:int) -> tuple[int, int, int] | None:
+        """Returns the level, experience and the experience not written to the database yet of a buffered user"""
+        entry = self.__entries.get((guild_id, user_id))
+        flushing = self.__flushing.get((guild_id, user_id))
+        if entry is None and flushing is None:
+            return None
+        pending = (entry[2] if entry else 0) + (flushing[2] if flushing else 0)
+        current = entry or flushing
+        return (current[0], current[1], pending)
+
+    async def add(self, guild_id:int, user_id:int, experience:int) -> tuple[bool, int, int]:
+        """Adds to the user's experience in memory
+
+        The return value contains a bool, for when the user has leveled up, aswell as the current user level and experience"""
+        entry = await self.__get_entry((guild_id, user_id))
+        previous_level = entry[0]
+        entry[0], entry[1] = split_total_xp(calculate_total_level_experience(previous_level) + entry[1] + experience)
+        entry[2] += experience
+        level_up = entry[0] > previous_level
+
+        if len(self.__entries) >= self.__max_entries and (self.__flush_task is None or self.__flush_task.done()):
+            self.__flush_task = asyncio.create_task(self.flush())
+        return (level_up, entry[0], entry[1])
+
+    async def __get_entry(self, key:tuple[int, int]) -> list[int]:
+        """Returns the buffered entry of the user, loading the current level and experience from the database if needed"""
+        while True:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                return entry
+
+            # The user is being written right now, continue from the written values
+            flushing = self.__flushing.get(key)
+            if flushing is not None:
+                entry = self.__entries[key] = [flushing[0], flushing[1], 0]
+                return entry
+
+            generation = self.__generation
+            rows = await self.__adapter.execute_query("get_level", key)
+            # Only trust the read, if no flush started while waiting for it
+            if generation == self.__generation and key not in self.__entries:
+                entry = self.__entries[key] = [rows[0]["level"], rows[0]["xp"], 0] if rows else [0, 0, 0]
+                return entry
+
+    async def flush(self):
+        """Writes the experience of all buffered users to the database, using a single statement"""
+        async with self.__flush_lock:
+            if not self.__entries:
+                return
+            begin_flush = datetime.now().timestamp()
+            self.__flushing, self.__entries = self.__entries, {}
+            self.__generation += 1
+            cancelled = False
+            try:
+                # Only the gained experience is written, the level kept in memory is just used to detect level ups
+                guild_ids, user_ids, experiences = [], [], []
+                for (guild_id, user_id), (_, _, experience) in self.__flushing.items():
+                    guild_ids.append(guild_id)
+                    user_ids.append(user_id)
+                    experiences.append(experience)
+                with self.__adapter.use_pool("background"):
+                    write = asyncio.ensure_future(self.__adapter.execute_query("flush_experience", (guild_ids, user_ids, experiences)))
+                try:
+                    # Shielded, as aborting the statement would leave it unknown whether the batch has been written
+                    await asyncio.shield(write)
+                except asyncio.CancelledError:
+                    # The cancellation is passed on, once the outcome of the statement is known
+                    cancelled = True
+                    await asyncio.wait([write])
+                    write.result()
+            except Exception:
+                # Keep the experience, it is written with the next flush
+                for key, (level, xp, experience) in self.__flushing.items():
+                    entry = self.__entries.get(key)
+                    if entry is None:
+                        self.__entries[key] = [level, xp, experience]
+                    else:
+                        entry[2] += experience
+                if cancelled:
+                    raise asyncio.CancelledError
+                raise
+            else:
+                self.__logger.debug(f"Flushed the experience of {len(guild_ids)} users after {get_elapsed_time_milliseconds(datetime.now().timestamp() - begin_flush)}")
+            finally:
+                self.__flushing = {}
+            if cancelled:
+                raise asyncio.CancelledError
+
+    async def __flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.__flush_interval)
+            try:
+                await self.flush()
+            except Exception as error:
+                self.__logger.error(f"Flushing the experience buffer failed, retrying with the next flush ({error.__class__.__name__}: {error})")
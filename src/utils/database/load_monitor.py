@@ -0,0 +1,76 @@
+import asyncio
+import logging
+from datetime import datetime
+from utils.database.abc_adapter import DatabaseAdapter
+
+class Load_Monitor:
+    """Watches the load of the database and switches the bot into a degraded mode while it is overloaded
+
+    The database counts as overloaded, if the 95th percentile of the query latency or of the time waited for a connection within the last
+    `window` seconds exceeds its threshold. The degraded mode is left once the database has not been overloaded for `recovery_time` seconds"""
+    def __init__(self, database_adapter:DatabaseAdapter, query_latency:float = 0.5, acquire_wait:float = 1.0, window:float = 10.0, recovery_time:float = 30.0, check_interval:float = 1.0):
+        self.__adapter = database_adapter
+        self.__query_latency = query_latency
+        self.__acquire_wait = acquire_wait
+        self.__window = window
+        self.__recovery_time = recovery_time
+        self.__check_interval = check_interval
+        self.__logger = logging.getLogger("utils.dbc.load")
+        self.__check_task:asyncio.Task | None = None
+
+        self.__degraded = False
+        # Time the degraded mode has been entered and the last time the database was found overloaded
+        self.__degraded_since = 0.0
+        self.__last_overloaded = 0.0
+        self.__transitions = 0
+        self.__time_degraded = 0.0
+
+    def start(self):
+        """Starts checking the load periodically"""
+        self.__check_task = asyncio.create_task(self.__check_periodically())
+        self.__logger.info(f"Load monitor started, degrading above a query latency of {self.__query_latency} or an acquire wait of {self.__acquire_wait} seconds")
+
+    def stop(self):
+        """Stops checking the load, the current mode is kept"""
+        if self.__check_task is not None:
+            self.__check_task.cancel()
+            self.__check_task = None
+
+    @property
+    def degraded(self) -> bool:
+        """True while the database is considered overloaded"""
+        return self.__degraded
+
+    def check(self):
+        """Compares the current load against the thresholds and enters or leaves the degraded mode"""
+        query_latency, acquire_wait = self.__adapter.get_load(self.__window)
+        now = datetime.now().timestamp()
+        if query_latency > self.__query_latency or acquire_wait > self.__acquire_wait:
+            self.__last_overloaded = now
+            if not self.__degraded:
+                self.__degraded = True
+                self.__degraded_since = now
+                self.__transitions += 1
+                self.__logger.warning(f"Entering the degraded mode, the database is overloaded (query latency: {query_latency:.3f}s, acquire wait: {acquire_wait:.3f}s)")
+        elif self.__degraded and now - self.__last_overloaded >= self.__recovery_time:
+            self.__degraded = False
+            self.__transitions += 1
+            self.__time_degraded += now - self.__degraded_since
+            self.__logger.info(f"Leaving the degraded mode after {now - self.__degraded_since:.0f} seconds (query latency: {query_latency:.3f}s, acquire wait: {acquire_wait:.3f}s)")
+
+    async def __check_periodically(self):
+        while True:
+            await asyncio.sleep(self.__check_interval)
+            try:
+                self.check()
+            except Exception as error:
+                self.__logger.error(f"Checking the load of the database failed ({error.__class__.__name__}: {error})")
+
+    def get_statistics(self) -> tuple[bool, int, float, float, float]:
+        """Returns whether the mode is currently degraded, the number of transitions between the modes, the total seconds spent degraded,
+        aswell as the current query latency and acquire wait"""
+        time_degraded = self.__time_degraded
+        if self.__degraded:
+            time_degraded += datetime.now().timestamp() - self.__degraded_since
+        query_latency, acquire_wait = self.__adapter.get_load(self.__window)
+        return self.__degraded, self.__transitions, time_degraded, query_latency, acquire_wait
@@ -1,13 +1,144 @@
 from utils.database.abc_adapter import DatabaseAdapter
 from utils.database.abc_controller import DatabaseController
+from utils.database.channel_cache import Channel_Settings_Cache
+from utils.database.experience_buffer import Experience_Buffer
+from utils.database.load_monitor import Load_Monitor
+import asyncio
 import asyncpg
 from datetime import datetime, timedelta
-from utils.calc_lvl_xp import calculate_current_level_experience
+from itertools import count
+from typing import Awaitable, Callable, Iterable
+from utils.calc_lvl_xp import split_total_xps
 
 class Main_DB_Controller(DatabaseController):
     """Controller used by most """
     def __init__(self, database_adapter: DatabaseAdapter) -> None:
         super().__init__(database_adapter)
+        self.__channel_cache = Channel_Settings_Cache()
+        self.__experience_buffer:Experience_Buffer | None = None
+        self.__load_monitor:Load_Monitor | None = None
+        self.__channel_refresh_task:asyncio.Task | None = None
+
+        # Version of the balances and experience of each guild, changed with every write so pages rendered from them can be invalidated
+        self.__write_counter = count(1)
+        self.__balance_versions:dict[int, int] = {}
+        self.__experience_versions:dict[int, int] = {}
+        # Version below which the experience of every guild is outdated
+        self.__experience_reset = 0
+
+    def get_balance_version(self, guild_id:int) -> int:
+        """Returns the version of the balances on the guild, which changes whenever one of them is written by this controller"""
+        return self.__balance_versions.get(guild_id, 0)
+
+    def get_experience_version(self, guild_id:int) -> int:
+        """Returns the version of the experience on the guild, which changes whenever it is written by this controller"""
+        return max(self.__experience_versions.get(guild_id, 0), self.__experience_reset)
+
+    def __balance_written(self, guild_id:int):
+        self.__balance_versions[guild_id] = next(self.__write_counter)
+
+    def __experience_written(self, guild_id:int):
+        self.__experience_versions[guild_id] = next(self.__write_counter)
+
+    def enable_experience_buffer(self, flush_interval:float = 10.0, max_entries:int = 1000):
+        """Buffers the experience added to users in memory, and writes it to the database every `flush_interval` seconds or at `max_entries` users
+        
+        While enabled, the experience stored in the database lags behind by up to one flush interval"""
+        if self.__experience_buffer is None:
+            self.__experience_buffer = Experience_Buffer(self._adapter, flush_interval, max_entries)
+            self.__experience_buffer.start()
+
+    @property
+    def experience_buffer_enabled(self) -> bool:
+        """True if the experience is buffered in memory, before written to the database"""
+        return self.__experience_buffer is not None
+
+    async def stop_experience_buffer(self):
+        """Writes the buffered experience to the database and stops buffering"""
+        if self.__experience_buffer is not None:
+            buffer, self.__experience_buffer = self.__experience_buffer, None
+            await buffer.stop()
+
+    def enable_load_monitor(self, query_latency:float = 0.5, acquire_wait:float = 1.0, recovery_time:float = 30.0):
+        """Watches the load of the database, to enter the degraded mode above the given thresholds (in seconds), see `Load_Monitor`"""
+        if self.__load_monitor is None:
+            self.__load_monitor = Load_Monitor(self._adapter, query_latency, acquire_wait, recovery_time = recovery_time)
+            self.__load_monitor.start()
+
+    def stop_load_monitor(self):
+        """Stops watching the load of the database and leaves the degraded mode"""
+        if self.__load_monitor is not None:
+            self.__load_monitor.stop()
+            self.__load_monitor = None
+
+    @property
+    def degraded(self) -> bool:
+        """True while the database is overloaded. Background work (e.g. experience) should be paused and pages answered from cache"""
+        return self.__load_monitor is not None and self.__load_monitor.degraded
+
+    def get_load_statistics(self) -> tuple[bool, int, float, float, float] | None:
+        """Returns the statistics of the load monitor (see `Load_Monitor.get_statistics`), None if the load is not monitored"""
+        if self.__load_monitor is None:
+            return None
+        return self.__load_monitor.get_statistics()
+
+    def get_statement_statistics(self) -> dict[str, tuple[int, int]]:
+        """Returns the number of hits and misses on the prepared statements, indexed by the query key, see `DatabaseAdapter.get_statement_statistics`"""
+        return self._adapter.get_statement_statistics()
+
+    def get_pool_statistics(self) -> dict[str, tuple[int, int, int, float, float]]:
+        """Returns the usage of the connection pools, indexed by the name of the pool, see `DatabaseAdapter.get_pool_statistics`"""
+        return self._adapter.get_pool_statistics()
+
+    def log_statistics(self):
+        """Logs the statistics of the prepared statements and the connection pools"""
+        self._adapter.log_statistics()
+
+    async def preload_channel_settings(self):
+        """Loads the enabled functionality and settings of every channel into memory
+        
+        Afterwards the channel lookups done for every message are answered without querying the database"""
+        functionality = {}
+        for row in await self._adapter.execute_query("get_all_channel_functionality"):
+            functionality[row["channel_id"]] = (row["experience"], row["pick_money"])
+
+        experience_settings = {}
+        for row in await self._adapter.execute_query("get_all_experience_settings"):
+            experience_settings[row["channel_id"]] = (row["default_multiplier"], row["minimum_threshold"], row["maximum_experience"])
+
+        pick_money_settings = {}
+        for row in await self._adapter.execute_query("get_all_pick_money_settings"):
+            pick_money_settings[row["channel_id"]] = (row["min_amount"], row["max_amount"], row["probability"])
+
+        self.__channel_cache.load(functionality, experience_settings, pick_money_settings)
+
+    async def reload_channel_settings(self):
+        """Loads the settings of every channel into memory again, picking up the changes made to the tables outside of the bot"""
+        self.__channel_cache.begin_reload()
+        with self._adapter.use_pool("background"):
+            await self.preload_channel_settings()
+
+    def enable_channel_settings_refresh(self, refresh_interval:float = 300.0):
+        """Reloads the settings of every channel every `refresh_interval` seconds"""
+        if self.__channel_refresh_task is None:
+            self.__channel_refresh_task = asyncio.create_task(self.__refresh_channel_settings_periodically(refresh_interval))
+
+    def stop_channel_settings_refresh(self):
+        """Stops reloading the settings of every channel periodically"""
+        if self.__channel_refresh_task is not None:
+            self.__channel_refresh_task.cancel()
+            self.__channel_refresh_task = None
+
+    async def __refresh_channel_settings_periodically(self, refresh_interval:float):
+        while True:
+            await asyncio.sleep(refresh_interval)
+            # Skipped while overloaded, the settings are not urgent enough to add to the load
+            if self.degraded:
+                continue
+            try:
+                await self.reload_channel_settings()
+            except Exception as error:
+                self._logger.error(f"Reloading the channel settings failed ({error.__class__.__name__}: {error})")
 
     async def get_user_currency(self, guild_id:int, user_id:int) -> int | None:
         """Queries and returns the account balance of a user, if it does not exist, the query returns None"""
@@ -17,27 +148,25 @@ class Main_DB_Controller(DatabaseController):
         return None
     
     async def get_number_of_users(self, guild_id:int) -> int:
-        """Querys and returns the number of users who ever owned money on an certain guild"""
-        return_value = await self._adapter.execute_query("currency_guild_users", (guild_id, ))
-        return return_value[0]["count"]
+        """Returns the number of users who ever owned money on an certain guild, as counted by the "count_guild_members" trigger"""
+        return_value = await self._adapter.execute_query("get_guild_member_count", (guild_id, ))
+        if return_value:
+            return return_value[0]["balance_users"]
+        return 0
     
     async def get_leaderboard_page_users(self, guild_id:int, offset:int, limit:int = 9) -> list[asyncpg.Record]:
         """Querys and returns the currency for an specified amount of users, on an specified guild with an specified offset"""
         return await self._adapter.execute_query("leaderboard_users", (guild_id, limit, offset))
-    
-    async def create_leaderboard_page(self, message_id:int, current_page:int):
-        """Creates a row in the database"""
-        await self._adapter.execute_query("create_leaderboard_view", (message_id, current_page))
-
-    async def get_leaderboard_page(self, message_id:int) -> int:
-        """Querys and returns the current page for a leaderboard view"""
-        return_value = await self._adapter.execute_query("get_leaderboard_page", (message_id, ))
-        return return_value[0]["current_page"]
-    
-    async def update_leaderboard_page(self, message_id:int, current_page:int):
-        """Updates the value in the database, to match the currently displayed page of the message"""
-        await self._adapter.execute_query("update_leaderboard_page", (current_page, message_id))
 
+    async def seek_leaderboard_page_users(self, guild_id:int, cursor:tuple[int, int], backwards:bool = False, limit:int = 9) -> list[asyncpg.Record]:
+        """Querys and returns the currency for an specified amount of users, following (or when `backwards` is `True`, preceding) the `(balance, user_id)` cursor
+        
+        Unlike the offset, the cost of the query does not depend on how deep the page is"""
+        if backwards:
+            rows = await self._adapter.execute_query("leaderboard_users_before", (guild_id, *cursor, limit))
+            return rows[::-1]
+        return await self._adapter.execute_query("leaderboard_users_after", (guild_id, *cursor, limit))
+    
     async def dailymoney_pickup_ready(self, user_id:int) -> bool:
         """Querys and compares the last time the specified user has collected his dailymoney
         
@@ -56,10 +185,41 @@ class Main_DB_Controller(DatabaseController):
     async def add_to_user_balance(self, guild_id:int, user_id:int, amount:int):
         """Adds to the balance of the specified user by the specified amount"""
         await self._adapter.execute_query("add_to_balance", (guild_id, user_id, amount))
+        self.__balance_written(guild_id)
+
+    async def add_to_users_balance(self, balances:Iterable[tuple[int, int, int]]) -> int:
+        """Adds to the balance of many users at once, each entry contains the guild id, user id and amount. Returns the number of updated balances"""
+        balances = list(balances)
+        updated = await self._adapter.execute_many("add_to_balance", balances)
+        for guild_id in {balance[0] for balance in balances}:
+            self.__balance_written(guild_id)
+        return updated
+
+    async def try_debit(self, guild_id:int, user_id:int, amount:int) -> int | None:
+        """Substracts the specified amount from the balance of the user, if the balance is sufficient
+
+        Returns the new balance, or None if the user has no balance or it is not sufficient (nothing is substracted then).
+        The check and the update are done by a single statement, so concurrent commands can not overdraw the balance"""
+        row = await self._adapter.execute_query("try_debit", (guild_id, user_id, amount))
+        if row:
+            self.__balance_written(guild_id)
+            return row[0]["balance"]
+        return None
+
+    async def settle_bet(self, guild_id:int, user_id:int, bet:int, payout:int) -> int | None:
+        """Takes the bet from the balance of the user and credits the payout, if the balance covers the bet
+
+        Returns the new balance, or None if the user has no balance or it is not sufficient (nothing is changed then)"""
+        row = await self._adapter.execute_query("settle_bet", (guild_id, user_id, bet, payout))
+        if row:
+            self.__balance_written(guild_id)
+            return row[0]["balance"]
+        return None
 
     async def substract_from_user_balance(self, guild_id:int, user_id:int, amount:int):
         """Substracts from the balance of the specified user by the specified amount"""
         await self._adapter.execute_query("substract_from_balance", (amount, guild_id, user_id))
+        self.__balance_written(guild_id)
     
     async def reset_pickup_ready(self, user_id:int):
         """Resets the pickup cooldown to the current time"""
@@ -175,32 +335,70 @@ class Main_DB_Controller(DatabaseController):
         """Add to the user's experience on a specific guild. 
         
         The return value contains a bool, for when the user has leveled up, aswell as the current user level and experience"""
-        # Get current stats of user
-        row = await self._adapter.execute_query("get_level", (guild_id, user_id))
+        self.__experience_written(guild_id)
+        if self.__experience_buffer is not None:
+            return await self.__experience_buffer.add(guild_id, user_id, experience)
+
+        # The level ups are carried over by the database, in the same statement that adds the experience
+        row = await self._adapter.execute_query("add_user_experience", (guild_id, user_id, experience))
+        return (row[0]["leveled_up"], row[0]["new_level"], row[0]["new_xp"])
+
+    async def award_message_experience(self, guild_id:int, user_id:int, channel_id:int, message_length:int, minimum_time_delta:float = 60.0) -> tuple[int | None, bool, int | None, int | None] | None:
+        """Awards the experience for a message in a single round trip, combining the cooldown check, the channel settings and the addition of the experience
+
+        Returns None if the user is still on cooldown. Otherwise the awarded experience (None if the channel has no settings, 0 if the message is below the threshold), 
+        a bool for when the user has leveled up, aswell as the current user level and experience"""
+        row = await self._adapter.execute_query("award_message_experience", (guild_id, user_id, channel_id, message_length, minimum_time_delta))
         if row:
-            user_xp = row[0]["xp"]
-            user_lvl = row[0]["level"]
-        else:
-            user_xp = 0
-            user_lvl = 0
-
-        # If the user has gained all the neccessary experience for the next level, level him up
-        user_xp += experience
-        level_up = False
-        while user_xp >= (level_xp := calculate_current_level_experience(user_lvl)):
-            user_xp -= level_xp
-            user_lvl += 1
-            level_up = True
-        await self._adapter.execute_query("add_experience", (guild_id, user_id, user_xp, user_lvl, experience))
-        return (level_up, user_lvl, user_xp)
+            if row[0]["experience"]:
+                self.__experience_written(guild_id)
+            return (row[0]["experience"], row[0]["leveled_up"], row[0]["new_level"], row[0]["new_xp"])
+        return None
 
     async def get_user_experience(self, guild_id:int, user_id:int) -> tuple[int, int] | None:
         """Returns the level and total experience of a user"""
         row = await self._adapter.execute_query("get_level", (guild_id, user_id))
+        buffered = self.__experience_buffer.peek(guild_id, user_id) if self.__experience_buffer is not None else None
+        if buffered is not None:
+            # The buffer is ahead of the database, until it has been flushed
+            level, xp, pending = buffered
+            return (xp, (row[0]["total_xp"] if row else 0) + pending, level)
         if row:
             return (row[0]["xp"], row[0]["total_xp"], row[0]["level"])
         return None
     
+    async def recompute_all_levels(self, progress_callback:Callable[[int, int], Awaitable] = None, batch_size:int = 50000) -> tuple[int, int]:
+        """Recomputes the level and experience of every user from their total experience, e.g. after the experience curve has changed
+
+        The users are streamed in batches through a server side cursor, the results are copied into the "level_recompute" staging table
+        and applied with a single update. `progress_callback` is awaited after each batch with the number of processed and total users.
+        Returns the number of processed and changed users"""
+        # Runs on its own pool, so the long running transaction does not hold a connection needed by the commands
+        with self._adapter.use_pool("admin"):
+            if self.__experience_buffer is not None:
+                await self.__experience_buffer.flush()
+            await self._adapter.check_tables(["level_recompute"])
+            total_users = (await self._adapter.execute_query("count_all_user_ranks"))[0]["count"]
+
+            processed_users = 0
+            async with self._adapter.transaction():
+                await self._adapter.execute_query("clear_level_recompute")
+                async for rows in self._adapter.fetch_batches("get_all_total_experience", batch_size = batch_size):
+                    total_xps = [row["total_xp"] or 0 for row in rows]
+                    records = [
+                        (row["guild_id"], row["user_id"], total_xp, level, xp)
+                        for row, total_xp, (level, xp) in zip(rows, total_xps, split_total_xps(total_xps))
+                    ]
+                    await self._adapter.copy_in("level_recompute", records, ["guild_id", "user_id", "total_xp", "level", "xp"])
+                    processed_users += len(rows)
+                    if progress_callback is not None:
+                        await progress_callback(processed_users, total_users)
+
+                changed_users = (await self._adapter.execute_query("apply_level_recompute"))[0]["count"]
+                await self._adapter.execute_query("clear_level_recompute")
+        self.__experience_reset = next(self.__write_counter)
+        return processed_users, changed_users
+
     async def get_user_rank(self, guild_id:int, user_id:int) -> int | None:
         row = await self._adapter.execute_query("get_leaderboard_position", (guild_id, user_id))
         if row:
@@ -208,21 +406,11 @@ class Main_DB_Controller(DatabaseController):
         return None
     
     async def get_number_of_level_users(self, guild_id:int) -> int:
-        """Returns the number of users who have xp on this guild"""
-        row = await self._adapter.execute_query("get_level_users", (guild_id, ))
-        return row[0]["count"]
-    
-    async def create_ranks_view(self, message_id:int, current_page:int):
-        """Inserts a row to store informations about the interactable ranks message"""
-        await self._adapter.execute_query("add_ranks_message", (message_id, current_page))
-
-    async def get_ranks_page(self, message_id:int) -> int:
-        """Returns the currently displayed page for a specific ranks view"""
-        row = await self._adapter.execute_query("get_ranks_page", (message_id, ))
-        return row[0]["current_page"]
-    
-    async def set_ranks_page(self, message_id:int, current_page:int):
-        await self._adapter.execute_query("set_ranks_page", (current_page, message_id))
+        """Returns the number of users who have xp on this guild, as counted by the "count_guild_members" trigger"""
+        row = await self._adapter.execute_query("get_guild_member_count", (guild_id, ))
+        if row:
+            return row[0]["level_users"]
+        return 0
     
     async def get_ranks_page_users(self, guild_id:int, page_number:int, user_per_page:int = 20) -> list[tuple]:
         """Returns users for the current ranks page"""
@@ -231,11 +419,26 @@ class Main_DB_Controller(DatabaseController):
         for row in rows:
             users_info.append((row["user_id"], row["level"], row["xp"], row["total_xp"]))
         return users_info
+
+    async def seek_ranks_page_users(self, guild_id:int, cursor:tuple[int, int], backwards:bool = False, user_per_page:int = 20) -> list[tuple]:
+        """Returns the users following (or when `backwards` is `True`, preceding) the `(total_xp, user_id)` cursor
+        
+        Unlike the page number, the cost of the query does not depend on how deep the page is"""
+        if backwards:
+            rows = (await self._adapter.execute_query("get_ranks_page_users_before", (guild_id, *cursor, user_per_page)))[::-1]
+        else:
+            rows = await self._adapter.execute_query("get_ranks_page_users_after", (guild_id, *cursor, user_per_page))
+        users_info = []
+        for row in rows:
+            users_info.append((row["user_id"], row["level"], row["xp"], row["total_xp"]))
+        return users_info
     
     async def get_channel_functionality(self, channel_id:int) -> tuple[bool]:
         """Returns the enabled functionality for a specific channel
         
         - [0]: Experience enabled? Default: No"""
+        if self.__channel_cache.loaded:
+            return self.__channel_cache.get_functionality(channel_id)
         row = await self._adapter.execute_query("get_channel_functionality", (channel_id, ))
         if row:
             return (row[0]["experience"], row[0]["pick_money"])
@@ -243,6 +446,8 @@ class Main_DB_Controller(DatabaseController):
     
     async def get_experience_settings(self, channel_id:int) -> tuple[float, int, int] | None:
         """Returns the settings for this channel, regarding the gain of experience"""
+        if self.__channel_cache.loaded:
+            return self.__channel_cache.get_experience_settings(channel_id)
         row = await self._adapter.execute_query("get_experience_settings", (channel_id, ))
         if row:
             return (row[0]["default_multiplier"], row[0]["minimum_threshold"], row[0]["maximum_experience"])
@@ -251,23 +456,12 @@ class Main_DB_Controller(DatabaseController):
     async def set_experience_settings(self, guild_id:int, channel_id:int, default_multiplier:float, minimum_threshold:int, maximum_experience:int):
         """Updates the settings for this channel, regarding the gain of experience"""
         await self._adapter.execute_query("set_channel_experience_settings", (guild_id, channel_id, default_multiplier, minimum_threshold, maximum_experience))
+        self.__channel_cache.set_experience_settings(channel_id, default_multiplier, minimum_threshold, maximum_experience)
 
-    async def user_for_experience_applicable(self, guild_id:int, user_id:int, minimum_time_delta:float = 60.0) -> bool:
-        """Check whater or not the user is applicable to recieve experience"""
-        row = await self._adapter.execute_query("get_last_xp_pickup", (user_id, guild_id))
-        if row:
-            last_pickup:datetime = row[0]["last_xp_pickup"]
-            if last_pickup == None or datetime.now().timestamp() - last_pickup.timestamp() >= minimum_time_delta:
-                return True
-            return False
-        return True
-    
-    async def reset_user_experience_gain(self, guild_id:int, user_id:int,):
-        """Resets the last_xp_pickup timer to the current time"""
-        await self._adapter.execute_query("reset_user_xp_gain_timer", (guild_id, user_id))
-        
     async def get_pick_money_settings(self, channel_id:int) -> tuple[int]:
         """Returns pick money settings of the specified channel"""
+        if self.__channel_cache.loaded:
+            return self.__channel_cache.get_pick_money_settings(channel_id)
         row = await self._adapter.execute_query("get_pick_money_settings", (channel_id, ))
         if row:
             return (row[0]["min_amount"], row[0]["max_amount"], row[0]["probability"])
@@ -1,23 +1,62 @@
 from utils.database.abc_adapter import DatabaseAdapter
 import asyncpg
+from collections import Counter, deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator
 from datetime import datetime
+import math
 from utils.datetime_tools import get_elapsed_time_milliseconds
 
+class Prepared_Connection(asyncpg.Connection):
+    """Connection class used by the pool, holding the statements prepared on this specific connection"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements:dict[str, asyncpg.prepared_stmt.PreparedStatement] = {}
+
 class PostgreSQL_Adapter(DatabaseAdapter):
-    """Adapter used to connect to an PostgreSQL type database"""
-    def __init__(self, username:str, password:str, database_name:str, adress:str, top_path: str, port:int, min_pool_size:int, max_pool_size:int):
+    """Adapter used to connect to an PostgreSQL type database
+
+    Manages one connection pool per class of workload. Querys use the `DEFAULT_POOL`, unless another one is selected with `use_pool`"""
+    DEFAULT_POOL = "interactive"
+    # Minimum and maximum number of connections, indexed by the name of the pool
+    DEFAULT_POOL_SIZES = {
+        "interactive": (2, 6),
+        "background": (1, 3),
+        "admin": (0, 1)
+    }
+    # Number of most recent query latencies and acquire waiting times (per pool) kept
+    WAIT_SAMPLES = 1000
+
+    def __init__(self, username:str, password:str, database_name:str, adress:str, top_path: str, port:int, pool_sizes:dict[str, tuple[int, int]]):
+        if self.DEFAULT_POOL not in pool_sizes:
+            raise ValueError(f"The {self.DEFAULT_POOL} pool has to be configured, only got {', '.join(pool_sizes)}")
         super().__init__("psql", top_path)
         self.__username = username
         self.__password = password
         self.__database_name = database_name
         self.__adress = adress
         self.__port = port
-        self.__min_pool_size = min_pool_size
-        self.__max_pool_size = max_pool_size
+        self.__pool_sizes = pool_sizes
+        self.__connection_pools:dict[str, asyncpg.Pool] = {}
+        # Pool the connections of the current task are taken from, None for the default pool
+        self.__selected_pool:ContextVar[str | None] = ContextVar(f"psql_pool_{self._instance_number}", default = None)
+        # Number of acquired connections and the most recent times waited for them (with the time they were acquired), indexed by the name of the pool
+        self.__acquisitions:Counter[str] = Counter()
+        self.__acquire_waits:dict[str, deque[tuple[float, float]]] = {pool_name: deque(maxlen = self.WAIT_SAMPLES) for pool_name in pool_sizes}
+        # Most recent query latencies, with the time the query completed
+        self.__query_latencies:deque[tuple[float, float]] = deque(maxlen = self.WAIT_SAMPLES)
+
+        # Counts how often a query could be executed with an already prepared statement (hit) and how often it had to be planned first (miss)
+        self.__statement_hits:Counter[str] = Counter()
+        self.__statement_misses:Counter[str] = Counter()
+
+        # Connection bound to the current task by an open session, None if the task has no open session
+        self.__bound_connection:ContextVar[asyncpg.Connection | None] = ContextVar(f"psql_connection_{self._instance_number}", default = None)
 
     @classmethod
-    async def create_adapter(cls, username:str, password:str, database_name:str, adress:str, top_path: str, port:int = 5432, min_pool_size:int = 5, max_pool_size:int = 10):
-        self = cls(username, password, database_name, adress, top_path, port, min_pool_size, max_pool_size)
+    async def create_adapter(cls, username:str, password:str, database_name:str, adress:str, top_path: str, port:int = 5432, pool_sizes:dict[str, tuple[int, int]] = None):
+        self = cls(username, password, database_name, adress, top_path, port, pool_sizes or cls.DEFAULT_POOL_SIZES)
         await self.connect()
         return self
 
@@ -25,32 +64,230 @@ class PostgreSQL_Adapter(DatabaseAdapter):
         self._logger.debug(f"Connecting to database ({self.__username}@{self.__adress}:{self.__port}/{self.__database_name}) ...")
         connection_begin = datetime.now().timestamp()
         try:
-            self.__connection_pool = await asyncpg.create_pool(
-                user = self.__username,
-                password = self.__password,
-                database = self.__database_name,
-                port = self.__port,
-                host = self.__adress,
-                min_size = self.__min_pool_size,
-                max_size = self.__max_pool_size,
-            )
+            for pool_name, (min_size, max_size) in self.__pool_sizes.items():
+                self.__connection_pools[pool_name] = await asyncpg.create_pool(
+                    user = self.__username,
+                    password = self.__password,
+                    database = self.__database_name,
+                    port = self.__port,
+                    host = self.__adress,
+                    min_size = min_size,
+                    max_size = max_size,
+                    connection_class = Prepared_Connection,
+                    init = self._prepare_connection
+                )
+                self._logger.debug(f"Created the {pool_name} pool with {min_size} to {max_size} connections")
         except asyncpg.exceptions.InvalidPasswordError as error:
             self._logger.critical("Establishment of the connection to the database failed, due to an invalid password")
             raise error
         else:
             self._logger.info(f"Connection to database successfully established after {get_elapsed_time_milliseconds(datetime.now().timestamp() - connection_begin)}")
 
+    async def _prepare_connection(self, connection:Prepared_Connection):
+        """Called by the pool for every newly created connection, prepares all known querys on it
+
+        Querys that fail to prepare (e.g. because the table does not exist yet) are skipped and prepared on their first execution instead"""
+        begin_prepare = datetime.now().timestamp()
+        for query_key, query in self._querys.items():
+            try:
+                connection.prepared_statements[query_key] = await connection.prepare(query)
+            except asyncpg.PostgresError as error:
+                self._logger.warning(f"Unable to prepare the query {query_key} for a new connection ({error.__class__.__name__}: {error}), it will be prepared on first use")
+        self._logger.debug(f"Prepared {len(connection.prepared_statements)} of {len(self._querys)} querys for a new connection after {get_elapsed_time_milliseconds(datetime.now().timestamp() - begin_prepare)}")
+
+    async def _get_prepared_statement(self, connection:Prepared_Connection, query_key:str) -> asyncpg.prepared_stmt.PreparedStatement:
+        """Returns the prepared statement of the query for the given connection, preparing it first if it is missing"""
+        statement = connection.prepared_statements.get(query_key)
+        if statement is None:
+            self.__statement_misses[query_key] += 1
+            statement = await connection.prepare(self._querys[query_key])
+            connection.prepared_statements[query_key] = statement
+        else:
+            self.__statement_hits[query_key] += 1
+        return statement
+
+    async def __prepare_again(self, connection:Prepared_Connection, query_key:str, error:asyncpg.exceptions.InvalidCachedStatementError) -> asyncpg.prepared_stmt.PreparedStatement:
+        """Called after the prepared statement of the query has been invalidated, e.g. by a change of the schema, returns it prepared again
+
+        Within a transaction the error has already aborted it, so the error is raised again and the statement is only prepared again on its next use"""
+        connection.prepared_statements.pop(query_key, None)
+        if connection.is_in_transaction():
+            raise error
+        return await self._get_prepared_statement(connection, query_key)
+
+    async def _fetch(self, connection:Prepared_Connection, query_key:str, arguments:tuple) -> list[asyncpg.Record]:
+        """Executes the prepared statement of the query on the given connection"""
+        begin_fetch = datetime.now().timestamp()
+        statement = await self._get_prepared_statement(connection, query_key)
+        try:
+            rows = await statement.fetch(*arguments)
+        except asyncpg.exceptions.InvalidCachedStatementError as error:
+            # The schema changed after the statement has been prepared, prepare it again and retry once
+            statement = await self.__prepare_again(connection, query_key, error)
+            rows = await statement.fetch(*arguments)
+        end_fetch = datetime.now().timestamp()
+        self.__query_latencies.append((end_fetch, end_fetch - begin_fetch))
+        return rows
+
     async def execute_query(self, query_key: str, arguments: tuple = ()) -> list[asyncpg.Record]:
-        """Method to execute a normal query, returns a tuple with the retrieved values"""
-        connection: asyncpg.Connection
-        async with self.__connection_pool.acquire() as connection:
-            records = await connection.fetch(self._querys[query_key], *arguments)
-        return records
+        """Method to execute a normal query, returns a tuple with the retrieved values
+
+        Uses the connection of the currently open session, if there is one"""
+        connection = self.__bound_connection.get()
+        if connection is not None:
+            return await self._fetch(connection, query_key, arguments)
+
+        connection: Prepared_Connection
+        async with self.__acquire_from_pool() as connection:
+            return await self._fetch(connection, query_key, arguments)
+
+    @contextmanager
+    def use_pool(self, pool_name:str) -> Iterator[None]:
+        """Takes the connections of all querys executed within the block (and tasks created in it) from the named pool
+
+        Sessions already open keep their connection. Unknown pools fall back to the default pool"""
+        if pool_name not in self.__connection_pools:
+            self._logger.warning(f"Pool {pool_name} is not configured, using the {self.DEFAULT_POOL} pool instead")
+            pool_name = None
+        token = self.__selected_pool.set(pool_name)
+        try:
+            yield
+        finally:
+            self.__selected_pool.reset(token)
+
+    @asynccontextmanager
+    async def __acquire_from_pool(self) -> AsyncIterator[Prepared_Connection]:
+        """Acquires a connection from the selected pool for the duration of the block, measuring the time waited for it"""
+        pool_name = self.__selected_pool.get() or self.DEFAULT_POOL
+        begin_acquire = datetime.now().timestamp()
+        async with self.__connection_pools[pool_name].acquire() as connection:
+            end_acquire = datetime.now().timestamp()
+            self.__acquire_waits[pool_name].append((end_acquire, end_acquire - begin_acquire))
+            self.__acquisitions[pool_name] += 1
+            yield connection
+
+    @asynccontextmanager
+    async def _acquire(self) -> AsyncIterator[Prepared_Connection]:
+        """Yields the connection of the currently open session, or acquires one from the pool for the duration of the block"""
+        connection = self.__bound_connection.get()
+        if connection is not None:
+            yield connection
+        else:
+            async with self.__acquire_from_pool() as connection:
+                yield connection
+
+    async def execute_many(self, query_key:str, arguments:Iterable[tuple]) -> int:
+        """Executes the prepared statement of the query once for every tuple of arguments, pipelined over a single connection
+
+        Either all executions succeed or none is applied"""
+        arguments = list(arguments)
+        begin_execute = datetime.now().timestamp()
+        async with self._acquire() as connection:
+            statement = await self._get_prepared_statement(connection, query_key)
+            try:
+                await statement.executemany(arguments)
+            except asyncpg.exceptions.InvalidCachedStatementError as error:
+                statement = await self.__prepare_again(connection, query_key, error)
+                await statement.executemany(arguments)
+        self._log_throughput("Executed", query_key, len(arguments), begin_execute)
+        return len(arguments)
+
+    async def fetch_batches(self, query_key:str, arguments:tuple = (), batch_size:int = 10000) -> AsyncIterator[list[asyncpg.Record]]:
+        """Streams the result of the query through a server side cursor, yielding up to `batch_size` rows at a time
+
+        The cursor needs a transaction, if the current session has none a (nested) one is opened for the duration of the iteration"""
+        async with self._acquire() as connection:
+            statement = await self._get_prepared_statement(connection, query_key)
+            async with connection.transaction():
+                cursor = await statement.cursor(*arguments)
+                while rows := await cursor.fetch(batch_size):
+                    yield rows
+
+    async def copy_in(self, table_name:str, records:Iterable[tuple], columns:list[str] = None) -> int:
+        """Bulk loads the records into the table using the binary COPY protocol, the values of each record have to be in the order of `columns`"""
+        begin_copy = datetime.now().timestamp()
+        async with self._acquire() as connection:
+            status = await connection.copy_records_to_table(table_name, records = records, columns = columns)
+        rows = self.__get_copied_rows(status)
+        self._log_throughput("Copied in", table_name, rows, begin_copy)
+        return rows
+
+    async def copy_out(self, query_key:str, output:Callable[[bytes], Awaitable], arguments:tuple = (), format:str = "csv") -> int:
+        """Streams the result of the query using COPY, `output` is awaited with every chunk of data in the given `format` (`csv`, `text` or `binary`)"""
+        # COPY expects the bare query, without the terminating semicolon
+        query = self._querys[query_key].strip().rstrip(";")
+        begin_copy = datetime.now().timestamp()
+        async with self._acquire() as connection:
+            status = await connection.copy_from_query(query, *arguments, output = output, format = format)
+        rows = self.__get_copied_rows(status)
+        self._log_throughput("Copied out", query_key, rows, begin_copy)
+        return rows
+
+    @staticmethod
+    def __get_copied_rows(status:str) -> int:
+        """Returns the number of rows from the status of a COPY command (e.g. `COPY 42`)"""
+        return int(status.split()[-1])
+
+    @asynccontextmanager
+    async def session(self, transaction:bool = False) -> AsyncIterator[asyncpg.Connection]:
+        """Binds a single pooled connection to every query executed within the block, optionally wrapped in a transaction
+
+        The connection is bound to the current task only. Tasks created inside the block inherit it, so do not run querys of one session concurrently"""
+        connection = self.__bound_connection.get()
+        if connection is not None:
+            # Reuse the connection of the outer session, a nested transaction becomes a savepoint
+            if transaction:
+                async with connection.transaction():
+                    yield connection
+            else:
+                yield connection
+            return
+
+        async with self.__acquire_from_pool() as connection:
+            token = self.__bound_connection.set(connection)
+            try:
+                if transaction:
+                    async with connection.transaction():
+                        yield connection
+                else:
+                    yield connection
+            finally:
+                self.__bound_connection.reset(token)
+
+    def get_statement_statistics(self) -> dict[str, tuple[int, int]]:
+        """Returns the number of hits and misses on the prepared statements, indexed by the query key
+
+        A miss means the query had to be planned during the call, because it was not prepared on the connection yet"""
+        return {query_key: (self.__statement_hits[query_key], self.__statement_misses[query_key]) for query_key in self._querys}
+
+    def get_pool_statistics(self) -> dict[str, tuple[int, int, int, float, float]]:
+        """Returns the number of open and idle connections, the number of acquisitions aswell as the average and maximum time (in seconds)
+        waited for one of the most recent connections, indexed by the name of the pool"""
+        statistics = {}
+        for pool_name, pool in self.__connection_pools.items():
+            waits = [wait for _, wait in self.__acquire_waits[pool_name]]
+            average_wait = sum(waits) / len(waits) if waits else 0.0
+            statistics[pool_name] = (pool.get_size(), pool.get_idle_size(), self.__acquisitions[pool_name], average_wait, max(waits, default = 0.0))
+        return statistics
+
+    def get_load(self, window:float = 10.0) -> tuple[float, float]:
+        """Returns the 95th percentile of the query latency and of the time waited for a connection of any pool (both in seconds),
+        within the last `window` seconds. Without a sample in the window, the value is 0"""
+        since = datetime.now().timestamp() - window
+        latencies = sorted(latency for completed, latency in self.__query_latencies if completed >= since)
+        waits = sorted(wait for pool_waits in self.__acquire_waits.values() for acquired, wait in pool_waits if acquired >= since)
+        return self.__get_percentile(latencies, 95), self.__get_percentile(waits, 95)
+
+    @staticmethod
+    def __get_percentile(sorted_values:list[float], percentile:float) -> float:
+        if not sorted_values:
+            return 0.0
+        return sorted_values[min(math.ceil(len(sorted_values) * percentile / 100) - 1, len(sorted_values) - 1)]
 
     async def _check_table(self, table_name: str, create_statement: str):
         """Internal method to check if the given table does exist. If it doesnt, the `create_statement` is executed to create it"""
         connection: asyncpg.Connection
-        async with self.__connection_pool.acquire() as connection:
+        async with self.__acquire_from_pool() as connection:
             table_exists = await connection.fetchval(f"""
                 SELECT EXISTS (
                     SELECT FROM pg_tables 
@@ -64,6 +301,29 @@ class PostgreSQL_Adapter(DatabaseAdapter):
                 await connection.execute(create_statement)
                 self._logger.info(f"Table {table_name} was missing, and has been created")
 
+    async def _create_routine(self, routine_name: str, create_statement: str):
+        """Internal method to create or replace the given routine, by executing the `create_statement`"""
+        connection: asyncpg.Connection
+        async with self.__acquire_from_pool() as connection:
+            await connection.execute(create_statement)
+        self._logger.debug(f"Routine {routine_name} has been created or replaced")
+
+    async def _create_index(self, index_name: str, create_statement: str):
+        """Internal method to create the given index if it does not exist yet, by executing the `create_statement`
+
+        Building the index of a large table takes a while on the first start, afterwards the statement returns immediately"""
+        connection: asyncpg.Connection
+        async with self.__acquire_from_pool() as connection:
+            try:
+                await connection.execute(create_statement)
+            except asyncpg.UndefinedTableError as error:
+                # The table is created later (or by another setup), the index follows on the next start
+                self._logger.warning(f"Index {index_name} could not be created ({error})")
+                return
+        self._logger.debug(f"Index {index_name} exists")
+
     async def close_connection(self):
-        await self.__connection_pool.close()
+        self.log_statistics()
+        for pool in self.__connection_pools.values():
+            await pool.close()
         self._logger.info("Connection to database has been closed")
\ No newline at end of file
@@ -3,15 +3,18 @@ import discord
 from utils.interaction_handler.general_handler import General_Handler
 
 class Button_Interaction_Handler(General_Handler):
-    """Provides the possibility to link an interaction callback function of an cog, to an button interaction the bot recieves."""
+    """Provides the possibility to link an interaction callback function of an cog, to an button interaction the bot recieves.
+    
+    The custom_id of a button may carry parameters (see `build_custom_id`), which are passed to the callback after the interaction"""
     logger = logging.getLogger("utils.btnh")
     lookup_table:dict[str, complex] = {}
 
     @classmethod
     async def handle_interaction(cls, interaction: discord.Interaction):
-        button_id = interaction.data["custom_id"]
+        # Parameters encoded into the custom_id (e.g. "econ.lb.next:3") are passed on to the callback
+        button_id, parameters = cls.split_custom_id(interaction.data["custom_id"])
         if button_id in cls.lookup_table:
-            func = cls.lookup_table[button_id](interaction)
+            func = cls.lookup_table[button_id](interaction, *parameters)
             cls.logger.debug(f"Interaction with button ({button_id}), handled by {func.__name__}")
             await func
         else:
@@ -9,6 +9,19 @@ class General_Handler(ABC):
     The handle_interaction classfunction must be implemented, the General_Handler CANNOT be used directly!"""
     logger: logging.Logger
     lookup_table:dict[str, complex] = {}
+    # Separates the custom_id the callback is linked to, from the parameters encoded into the custom_id of the component
+    PARAMETER_SEPARATOR = ":"
+
+    @classmethod
+    def build_custom_id(cls, custom_id:str, *parameters) -> str:
+        """Returns the custom_id with the provided parameters appended, they are passed to the linked callback as additional (string) arguments"""
+        return cls.PARAMETER_SEPARATOR.join([custom_id, *(str(parameter) for parameter in parameters)])
+
+    @classmethod
+    def split_custom_id(cls, custom_id:str) -> tuple[str, list[str]]:
+        """Splits the custom_id of a component into the custom_id the callback is linked to and the encoded parameters"""
+        linked_id, *parameters = custom_id.split(cls.PARAMETER_SEPARATOR)
+        return linked_id, parameters
 
     @classmethod
     def link_button_callback(cls, custom_id:str = "", instance = None):
@@ -16,6 +29,8 @@ class General_Handler(ABC):
         def decorator(func):
             if custom_id == "":
                 raise ValueError(f"custom_id must contain a valid value, not '{custom_id}'")
+            if cls.PARAMETER_SEPARATOR in custom_id:
+                raise ValueError(f"custom_id must not contain the parameter separator '{cls.PARAMETER_SEPARATOR}', not '{custom_id}'")
         
             if custom_id in cls.lookup_table:
                 cls.logger.warning(f"The handler for the {custom_id} was overridden")
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from time import monotonic
+from typing import Any, Awaitable, Callable, Hashable
+
+class Rendered_Page_Cache:
+    """Short lived LRU cache for rendered pages (e.g. of the leaderboard), indexed by guild and a key of the page
+
+    Every entry is stored with the version of the data it was rendered from. A lookup with another version is a miss,
+    so a write to the guild invalidates its pages without having to know about them"""
+    def __init__(self, time_to_live:float = 30.0, max_entries:int = 1000):
+        self.__time_to_live = time_to_live
+        self.__max_entries = max_entries
+        # Indexed by (guild_id, key), holding the version, the time it expires and the value
+        self.__entries:OrderedDict[tuple[int, Hashable], tuple[Hashable, float, Any]] = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        # Renders currently running, so concurrent lookups of the same page share one render
+        self.__pending:dict[tuple[int, Hashable, Hashable], asyncio.Task] = {}
+
+    def get(self, guild_id:int, key:Hashable, version:Hashable, allow_outdated:bool = False) -> Any | None:
+        """Returns the cached value, or None if there is none rendered from the given version within the time to live
+
+        With `allow_outdated`, a value rendered from an older version is returned aswell (e.g. while the database is overloaded)"""
+        entry = self.__entries.get((guild_id, key))
+        if entry is None or (entry[0] != version and not allow_outdated) or entry[1] < monotonic():
+            self.__misses += 1
+            return None
+        self.__entries.move_to_end((guild_id, key))
+        self.__hits += 1
+        return entry[2]
+
+    def put(self, guild_id:int, key:Hashable, version:Hashable, value:Any):
+        """Stores the value rendered from the given version of the data"""
+        self.__entries[(guild_id, key)] = (version, monotonic() + self.__time_to_live, value)
+        self.__entries.move_to_end((guild_id, key))
+        while len(self.__entries) > self.__max_entries:
+            self.__entries.popitem(last = False)
+
+    async def get_or_render(self, guild_id:int, key:Hashable, version:Hashable, render:Callable[[], Awaitable[Any]]) -> Any:
+        """Returns the cached value, or renders and stores it. A lookup of a page already being rendered waits for that render
+
+        Cancelling the lookup that started a render cancels the render, other lookups waiting for it then render on their own"""
+        value = self.get(guild_id, key, version)
+        if value is not None:
+            return value
+
+        pending_key = (guild_id, key, version)
+        task = self.__pending.get(pending_key)
+        if task is not None:
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # Only continue if the render got cancelled, not this lookup
+                if not task.cancelled():
+                    raise
+
+        task = self.__pending[pending_key] = asyncio.create_task(render())
+        try:
+            value = await task
+        finally:
+            if self.__pending.get(pending_key) is task:
+                del self.__pending[pending_key]
+        self.put(guild_id, key, version, value)
+        return value
+
+    def get_statistics(self) -> tuple[int, int, float]:
+        """Returns the number of hits and misses, aswell as the hit rate"""
+        lookups = self.__hits + self.__misses
+        return self.__hits, self.__misses, self.__hits / lookups if lookups else 0.0
+
+class Page_Prefetcher:
+    """Renders the pages next to the one shown in the background, so the next page turn can be answered from memory
+
+    Prefetches are grouped by the message showing the pages. Showing another page on the message replaces the prefetches still running,
+    they are also cancelled once the message went idle for `idle_timeout` seconds. At most `max_concurrency` pages are rendered at once"""
+    def __init__(self, max_concurrency:int = 2, idle_timeout:float = 60.0):
+        self.__semaphore = asyncio.Semaphore(max_concurrency)
+        self.__idle_timeout = idle_timeout
+        self.__logger = logging.getLogger("utils.prefetch")
+        # Indexed by the id of the message, holding the prefetches and the handle cancelling them when the message went idle
+        self.__prefetches:dict[int, tuple[list[asyncio.Task], asyncio.TimerHandle]] = {}
+
+    def schedule(self, message_id:int, renders:list[Callable[[], Awaitable[Any]]]):
+        """Starts rendering the pages in the background, replacing the prefetches of the message still running"""
+        self.cancel(message_id)
+        if not renders:
+            return
+        tasks = [asyncio.create_task(self.__prefetch(render)) for render in renders]
+        idle_handle = asyncio.get_running_loop().call_later(self.__idle_timeout, self.cancel, message_id)
+        self.__prefetches[message_id] = (tasks, idle_handle)
+
+    async def __prefetch(self, render:Callable[[], Awaitable[Any]]):
+        try:
+            async with self.__semaphore:
+                await render()
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            # The page is rendered again when it is requested, so a failed prefetch is not fatal
+            self.__logger.warning(f"Prefetching a page failed ({error.__class__.__name__}: {error})")
+
+    def cancel(self, message_id:int):
+        """Cancels the prefetches of the message still running"""
+        prefetch = self.__prefetches.pop(message_id, None)
+        if prefetch is None:
+            return
+        tasks, idle_handle = prefetch
+        idle_handle.cancel()
+        for task in tasks:
+            task.cancel()
+
+    def cancel_all(self):
+        """Cancels all prefetches still running, e.g. when the cog gets unloaded"""
+        for message_id in list(self.__prefetches):
+            self.cancel(message_id)
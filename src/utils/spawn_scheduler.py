@@ -0,0 +1,36 @@
+import math
+import random
+
+class Spawn_Scheduler:
+    """Decides per channel, with which message the next spawn (e.g. of pick money) happens
+
+    Rolling a chance of 1 in `probability` on every message spaces the spawns geometrically. Instead the number of messages until the
+    next spawn is drawn once from that geometric distribution and counted down in memory, so a message only costs a decrement"""
+    def __init__(self):
+        # Indexed by the channel id, holding the probability the countdown has been drawn for and the messages left until the next spawn
+        self.__countdowns:dict[int, list[int]] = {}
+
+    @staticmethod
+    def draw_gap(probability:int) -> int:
+        """Draws the number of messages until (and including) the next spawn, for a chance of 1 in `probability` per message"""
+        if probability <= 1:
+            return 1
+        # Inverse transform sampling, 1 - random() lies within (0, 1]
+        return math.floor(math.log(1.0 - random.random()) / math.log1p(-1.0 / probability)) + 1
+
+    def tick(self, channel_id:int, probability:int) -> bool:
+        """Counts a message sent into the channel, returns `True` if it spawns"""
+        countdown = self.__countdowns.get(channel_id)
+        if countdown is None or countdown[0] != probability:
+            # The distribution is memoryless, so drawing a new countdown after the chance changed does not bias it
+            countdown = self.__countdowns[channel_id] = [probability, self.draw_gap(probability)]
+        countdown[1] -= 1
+        if countdown[1] > 0:
+            return False
+        countdown[1] = self.draw_gap(probability)
+        return True
+
+    def forget(self, channel_id:int):
+        """Removes the countdown of the channel, e.g. after the spawns have been disabled for it"""
+        self.__countdowns.pop(channel_id, None)
+
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from time import monotonic
+import discord
+from discord.ext import commands
+
+class User_Name_Resolver:
+    """Resolves the names of many users at once, shared by all cogs of the bot
+
+    Names are taken from a bounded LRU cache first, then from the cache of discord.py and only then fetched from the API.
+    Fetches run concurrently (limited to `max_concurrency` at once), a fetch taking longer than `timeout` seconds is displayed as the raw ID.
+    It continues in the background and fills the cache for the next lookup"""
+    def __init__(self, bot:commands.Bot, max_size:int = 10000, time_to_live:float = 3600.0, max_concurrency:int = 5, timeout:float = 1.5):
+        self.__bot = bot
+        self.__max_size = max_size
+        self.__time_to_live = time_to_live
+        self.__timeout = timeout
+        self.__semaphore = asyncio.Semaphore(max_concurrency)
+        self.__logger = logging.getLogger("utils.users")
+
+        # Indexed by the user id, holding the name and the time it expires, ordered from least to most recently used
+        self.__names:OrderedDict[int, tuple[str, float]] = OrderedDict()
+        # Fetches currently running, so concurrent lookups of the same user share one request
+        self.__pending:dict[int, asyncio.Task] = {}
+
+    def __get_cached(self, user_id:int) -> str | None:
+        cached = self.__names.get(user_id)
+        if cached is None:
+            return None
+        name, expires = cached
+        if expires < monotonic():
+            del self.__names[user_id]
+            return None
+        self.__names.move_to_end(user_id)
+        return name
+
+    def __store(self, user_id:int, name:str):
+        self.__names[user_id] = (name, monotonic() + self.__time_to_live)
+        self.__names.move_to_end(user_id)
+        while len(self.__names) > self.__max_size:
+            self.__names.popitem(last = False)
+
+    async def __fetch_name(self, user_id:int) -> str:
+        try:
+            async with self.__semaphore:
+                user = await self.__bot.fetch_user(user_id)
+        except discord.NotFound:
+            name = str(user_id)
+        except discord.HTTPException as error:
+            self.__logger.warning(f"Unable to fetch the user {user_id} ({error.__class__.__name__}: {error})")
+            return str(user_id)
+        else:
+            name = user.name
+        self.__store(user_id, name)
+        return name
+
+    async def resolve_names(self, user_ids:list[int]) -> dict[int, str]:
+        """Returns the names of the given users, indexed by their id. Users that could not be resolved in time are named by their id"""
+        names:dict[int, str] = {}
+        fetches:dict[int, asyncio.Task] = {}
+        for user_id in user_ids:
+            if user_id in names or user_id in fetches:
+                continue
+            name = self.__get_cached(user_id)
+            if name is None:
+                user = self.__bot.get_user(user_id)
+                if user is not None:
+                    name = user.name
+                    self.__store(user_id, name)
+            if name is not None:
+                names[user_id] = name
+                continue
+
+            task = self.__pending.get(user_id)
+            if task is None:
+                task = self.__pending[user_id] = asyncio.create_task(self.__fetch_name(user_id))
+                task.add_done_callback(lambda _, user_id = user_id: self.__pending.pop(user_id, None))
+            fetches[user_id] = task
+
+        if fetches:
+            # Fetches still running after the timeout are not cancelled, they fill the cache when they complete
+            done, _ = await asyncio.wait(fetches.values(), timeout = self.__timeout)
+            for user_id, task in fetches.items():
+                names[user_id] = task.result() if task in done and task.exception() is None else str(user_id)
+            if len(done) < len(fetches):
+                self.__logger.debug(f"{len(fetches) - len(done)} of {len(fetches)} users could not be fetched within {self.__timeout} seconds")
+        return names
+
+    async def resolve_name(self, user_id:int) -> str:
+        """Returns the name of a single user, or its id if it could not be resolved in time"""
+        return (await self.resolve_names([user_id]))[user_id]
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from time import monotonic
+from typing import Any, Awaitable, Callable
+
+class Fair_Work_Queue:
+    """Bounded queue of work items, handled by a fixed number of workers
+
+    Each guild has its own line and the workers take turns between the lines, so a single busy guild can not starve the others.
+    When the queue is full, items marked as low value are dropped first. Otherwise the oldest item of the longest line makes room"""
+    # Number of most recent waiting times kept to calculate the statistics
+    WAIT_SAMPLES = 1000
+
+    def __init__(self, handler:Callable[[Any], Awaitable], workers:int = 4, max_size:int = 1000, name:str = "queue"):
+        if workers < 1:
+            raise ValueError(f"At least one worker is needed, not '{workers}'")
+        if max_size < 1:
+            raise ValueError(f"max_size must be at least 1, not '{max_size}'")
+        self.__handler = handler
+        self.__number_of_workers = workers
+        self.__max_size = max_size
+        self.__logger = logging.getLogger(f"utils.queue.{name}")
+
+        # Indexed by the guild id, each line holds the time it was queued, whether it is of low value and the item itself
+        self.__lines:OrderedDict[int, deque[tuple[float, bool, Any]]] = OrderedDict()
+        self.__size = 0
+        self.__not_empty = asyncio.Event()
+        self.__workers:list[asyncio.Task] = []
+
+        self.__waits:deque[float] = deque(maxlen = self.WAIT_SAMPLES)
+        self.__processed = 0
+        self.__dropped_low_value = 0
+        self.__dropped = 0
+
+    def start(self):
+        """Starts the workers"""
+        self.__workers = [asyncio.create_task(self.__work()) for _ in range(self.__number_of_workers)]
+        self.__logger.info(f"Started {self.__number_of_workers} workers, queueing up to {self.__max_size} items")
+
+    async def stop(self):
+        """Cancels the workers and waits for them to finish, items still queued are discarded
+
+        The item a worker is handling is cancelled aswell, the handler has to pass the cancellation on to the tasks it started"""
+        workers, self.__workers = self.__workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions = True)
+        if self.__size:
+            self.__logger.warning(f"Discarded {self.__size} queued items")
+        self.__lines.clear()
+        self.__size = 0
+        self.log_statistics()
+
+    def put(self, guild_id:int, item:Any, low_value:bool = False) -> bool:
+        """Queues the item in the line of the guild, returns `False` if it has been dropped because the queue is full"""
+        if self.__size >= self.__max_size:
+            if low_value:
+                self.__dropped_low_value += 1
+                self.__log_dropped()
+                return False
+            self.__make_room()
+            self.__log_dropped()
+        else:
+            self.__size += 1
+
+        line = self.__lines.get(guild_id)
+        if line is None:
+            line = self.__lines[guild_id] = deque()
+        line.append((monotonic(), low_value, item))
+        self.__not_empty.set()
+        return True
+
+    def __make_room(self):
+        """Drops an item of the longest line, preferably one of low value"""
+        guild_id, line = max(self.__lines.items(), key = lambda guild_line: len(guild_line[1]))
+        for entry in line:
+            if entry[1]:
+                line.remove(entry)
+                self.__dropped_low_value += 1
+                break
+        else:
+            line.popleft()
+            self.__dropped += 1
+        if not line:
+            del self.__lines[guild_id]
+
+    def __log_dropped(self):
+        # Only every thousandth drop is logged, to not flood the log while the queue is overloaded
+        if (self.__dropped_low_value + self.__dropped) % 1000 == 1:
+            self.__logger.warning(f"Queue is full, {self.__dropped_low_value} items of low value and {self.__dropped} other items have been dropped so far")
+
+    async def __work(self):
+        while True:
+            while not self.__lines:
+                self.__not_empty.clear()
+                await self.__not_empty.wait()
+
+            # Take the oldest item of the first line, then move the line to the back
+            guild_id, line = next(iter(self.__lines.items()))
+            queued, _, item = line.popleft()
+            self.__size -= 1
+            if line:
+                self.__lines.move_to_end(guild_id)
+            else:
+                del self.__lines[guild_id]
+
+            self.__waits.append(monotonic() - queued)
+            try:
+                await self.__handler(item)
+            except Exception as error:
+                self.__logger.error(f"Handling a queued item of guild {guild_id} failed ({error.__class__.__name__}: {error})")
+            self.__processed += 1
+
+    @property
+    def depth(self) -> int:
+        """Number of items currently queued"""
+        return self.__size
+
+    def log_statistics(self):
+        """Logs the depth, waiting times and drop counters of the queue"""
+        depth, average_wait, maximum_wait, processed, dropped_low_value, dropped = self.get_statistics()
+        self.__logger.info(
+            f"Queue depth {depth}, waited {average_wait * 1000:.1f} ms on average and {maximum_wait * 1000:.1f} ms at most, "
+            f"{processed} processed, {dropped_low_value} items of low value and {dropped} other items dropped"
+        )
+
+    def get_statistics(self) -> tuple[int, float, float, int, int, int]:
+        """Returns the depth, the average and maximum waiting time (in seconds) of the most recent items,
+        aswell as the number of processed items, dropped items of low value and other dropped items"""
+        average_wait = sum(self.__waits) / len(self.__waits) if self.__waits else 0.0
+        maximum_wait = max(self.__waits, default = 0.0)
+        return self.__size, average_wait, maximum_wait, self.__processed, self.__dropped_low_value, self.__dropped
@@ -0,0 +1,61 @@
+import asyncio
+from conftest import load_sql_file
+from utils.calc_lvl_xp import calculate_current_level_experience, calculate_total_level_experience, level_from_total_xp, levels_from_total_xp, split_total_xps
+
+MAX_LEVEL = 10 ** 5
+
+def boundary_values() -> tuple[list[int], list[int]]:
+    """Returns the total XP right below, at and right above the start of every level up to `MAX_LEVEL`, aswell as the level expected for each"""
+    total_xps, levels = [], []
+    for level in range(MAX_LEVEL + 1):
+        total_xp = calculate_total_level_experience(level)
+        if level > 0:
+            total_xps.append(total_xp - 1)
+            levels.append(level - 1)
+        total_xps += [total_xp, total_xp + 1]
+        levels += [level, level]
+    return total_xps, levels
+
+def test_total_level_experience_matches_the_loop():
+    # The closed form has to equal adding up the experience of every level, like the level up loop did
+    total_xp = 0
+    for level in range(MAX_LEVEL + 1):
+        assert calculate_total_level_experience(level) == total_xp
+        total_xp += calculate_current_level_experience(level)
+
+def test_level_from_total_xp_is_exact():
+    total_xps, levels = boundary_values()
+    for total_xp, level in zip(total_xps, levels):
+        assert level_from_total_xp(total_xp) == level, total_xp
+
+def test_split_total_xps_is_exact():
+    total_xps, levels = boundary_values()
+    expected = [(level, total_xp - calculate_total_level_experience(level)) for total_xp, level in zip(total_xps, levels)]
+    assert split_total_xps(total_xps) == expected
+    assert levels_from_total_xp(reversed(total_xps)) == levels[::-1]
+
+def test_split_total_xps_of_nothing():
+    assert split_total_xps([]) == []
+    assert split_total_xps([0, 99, 100]) == [(0, 0), (0, 99), (1, 0)]
+
+def test_sql_level_from_total_experience_is_exact(postgres_dsn:str):
+    import asyncpg
+    total_xps, levels = boundary_values()
+
+    async def run() -> list[int]:
+        connection:asyncpg.Connection = await asyncpg.connect(postgres_dsn)
+        try:
+            await connection.execute('DROP SCHEMA IF EXISTS "apollo_test" CASCADE')
+            await connection.execute('CREATE SCHEMA "apollo_test"')
+            await connection.execute('SET search_path TO "apollo_test"')
+            await connection.execute(load_sql_file("func-level_from_total_experience.sql"))
+            rows = await connection.fetch("""
+                SELECT level_from_total_experience("total_xp") AS "level"
+                FROM UNNEST($1::BIGINT[]) WITH ORDINALITY AS "values" ("total_xp", "position")
+                ORDER BY "position"
+            """, total_xps)
+            return [row["level"] for row in rows]
+        finally:
+            await connection.execute('DROP SCHEMA IF EXISTS "apollo_test" CASCADE')
+            await connection.close()
+    assert asyncio.run(run()) == levels
@@ -0,0 +1,89 @@
+import random
+from time import perf_counter
+from typing import Callable
+import pytest
+import utils.cooldown_tracker
+from utils.cooldown_tracker import Cooldown_Tracker
+
+class Fake_Clock:
+    def __init__(self):
+        self.time = 1000.0
+
+    def __call__(self) -> float:
+        return self.time
+
+@pytest.fixture
+def clock(monkeypatch) -> Fake_Clock:
+    clock = Fake_Clock()
+    monkeypatch.setattr(utils.cooldown_tracker, "monotonic", clock)
+    return clock
+
+def test_claim_blocks_until_the_cooldown_has_passed(clock:Fake_Clock):
+    tracker = Cooldown_Tracker(60.0)
+    clock.time += 0.9
+    assert tracker.try_claim(1, 2)
+    assert not tracker.try_claim(1, 2)
+    assert tracker.try_claim(1, 3)
+
+    # The cooldown never ends before the full 60 seconds, regardless of the fraction of the second it started in
+    clock.time += 59.99
+    assert not tracker.try_claim(1, 2)
+    assert tracker.is_on_cooldown(1, 2)
+    clock.time += 1.0
+    assert not tracker.is_on_cooldown(1, 2)
+    assert tracker.try_claim(1, 2)
+
+def test_cooldown_follows_the_confirmed_claims(clock:Fake_Clock):
+    tracker = Cooldown_Tracker(60.0)
+    # The database refused the claim (e.g. claimed before a restart), so the tracker is not armed and the next message asks again
+    assert not tracker.is_on_cooldown(1, 2)
+    clock.time += 30.0
+    assert not tracker.is_on_cooldown(1, 2)
+
+    # Once confirmed, the tracker ends at or after the cooldown in the database and never locks out a claim it would accept
+    tracker.start_cooldown(1, 2)
+    clock.time += 59.5
+    assert tracker.is_on_cooldown(1, 2)
+    clock.time += 1.5
+    assert not tracker.is_on_cooldown(1, 2)
+
+def test_full_probe_window_evicts_the_entry_expiring_first(clock:Fake_Clock):
+    tracker = Cooldown_Tracker(60.0, capacity = 8)
+    for user_id in range(8):
+        assert tracker.try_claim(1, user_id)
+        clock.time += 1.0
+    # Every slot is taken, so the pair recorded first is forgotten and reported as ready
+    assert tracker.try_claim(1, 8)
+    assert tracker.try_claim(1, 0)
+    assert not tracker.try_claim(1, 8)
+
+def test_capacity_has_to_be_a_power_of_two():
+    with pytest.raises(ValueError):
+        Cooldown_Tracker(capacity = 1000)
+
+def test_memory_usage_per_million_active_users():
+    # The documented number: 2^21 slots keep one million active users below a load factor of 0.5 in about 40 MB
+    assert Cooldown_Tracker(capacity = 2 ** 21).memory_usage() == 20 * 2 ** 21
+
+def active_user_messages() -> list[tuple[int, int]]:
+    """One million active users across a thousand guilds, followed by another million messages of the same users"""
+    generator = random.Random(25)
+    pairs = [(generator.randrange(1000), generator.randrange(2 ** 60)) for _ in range(1_000_000)]
+    return pairs + generator.choices(pairs, k = 1_000_000)
+
+def test_million_active_users_fit_the_table():
+    tracker = Cooldown_Tracker(60.0, capacity = 2 ** 21)
+    pairs = active_user_messages()
+    claimed = sum(tracker.try_claim(guild_id, user_id) for guild_id, user_id in pairs)
+    # Only the pairs evicted from a full probe window are claimed twice
+    assert len(set(pairs)) <= claimed <= len(set(pairs)) * 1.01
+    assert tracker.memory_usage() <= 40 * 2 ** 20
+
+def test_check_and_set_throughput(throughput_baseline:Callable[[str, float], None]):
+    """Benchmark of a message hitting the tracker, run with "APOLLO_BENCHMARK=1 python -m pytest -s tests/test_cooldown_tracker.py" to compare against the baseline"""
+    tracker = Cooldown_Tracker(60.0, capacity = 2 ** 21)
+    pairs = active_user_messages()
+    begin = perf_counter()
+    for guild_id, user_id in pairs:
+        tracker.try_claim(guild_id, user_id)
+    throughput_baseline("cooldown_tracker.check_and_set", len(pairs) / (perf_counter() - begin))
@@ -0,0 +1,71 @@
+import asyncio
+from contextlib import contextmanager
+from utils.database.experience_buffer import Experience_Buffer
+
+class Fake_Adapter:
+    """Stands in for the database adapter, every flush takes `write_delay` seconds and fails while `failing` is set"""
+    def __init__(self, write_delay:float = 0.0):
+        self.write_delay = write_delay
+        self.failing = False
+        self.written:dict[tuple[int, int], int] = {}
+
+    @contextmanager
+    def use_pool(self, pool_name:str):
+        yield
+
+    async def execute_query(self, query_key:str, arguments:tuple = ()) -> list:
+        if query_key == "get_level":
+            return []
+        await asyncio.sleep(self.write_delay)
+        if self.failing:
+            raise ConnectionError("database is gone")
+        guild_ids, user_ids, experiences = arguments
+        for guild_id, user_id, experience in zip(guild_ids, user_ids, experiences):
+            self.written[(guild_id, user_id)] = self.written.get((guild_id, user_id), 0) + experience
+        return []
+
+def test_stop_writes_the_batch_of_a_cancelled_flush_once():
+    async def run():
+        adapter = Fake_Adapter(write_delay = 0.05)
+        buffer = Experience_Buffer(adapter, flush_interval = 0.01)
+        buffer.start()
+        await buffer.add(1, 2, 30)
+        # Stop while the periodic flush is in the middle of writing
+        await asyncio.sleep(0.03)
+        await buffer.add(1, 3, 10)
+        await buffer.stop()
+        return adapter.written
+    assert asyncio.run(run()) == {(1, 2): 30, (1, 3): 10}
+
+def test_failed_flush_puts_the_batch_back():
+    async def run():
+        adapter = Fake_Adapter()
+        buffer = Experience_Buffer(adapter)
+        await buffer.add(1, 2, 30)
+        adapter.failing = True
+        try:
+            await buffer.flush()
+        except ConnectionError:
+            pass
+        assert buffer.peek(1, 2) == (0, 30, 30)
+        adapter.failing = False
+        await buffer.add(1, 2, 5)
+        await buffer.flush()
+        return adapter.written
+    assert asyncio.run(run()) == {(1, 2): 35}
+
+def test_cancelled_flush_puts_the_batch_back_if_the_write_failed():
+    async def run():
+        adapter = Fake_Adapter(write_delay = 0.05)
+        adapter.failing = True
+        buffer = Experience_Buffer(adapter)
+        await buffer.add(1, 2, 30)
+        flush = asyncio.create_task(buffer.flush())
+        await asyncio.sleep(0.01)
+        flush.cancel()
+        await asyncio.gather(flush, return_exceptions = True)
+        assert flush.cancelled()
+        adapter.failing = False
+        await buffer.stop()
+        return adapter.written
+    assert asyncio.run(run()) == {(1, 2): 30}
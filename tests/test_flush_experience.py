@@ -0,0 +1,32 @@
+import asyncio
+from conftest import load_sql_file
+from utils.calc_lvl_xp import split_total_xp
+
+async def flush_twice_around_a_recompute(dsn:str) -> list[tuple[int, int, int, int]]:
+    import asyncpg
+    connection:asyncpg.Connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute('DROP SCHEMA IF EXISTS "apollo_test" CASCADE')
+        await connection.execute('CREATE SCHEMA "apollo_test"')
+        await connection.execute('SET search_path TO "apollo_test"')
+        await connection.execute(load_sql_file("ddl-user_rank.sql"))
+        await connection.execute(load_sql_file("func-level_from_total_experience.sql"))
+        await connection.execute(load_sql_file("func-total_level_experience.sql"))
+        flush = load_sql_file("query-flush_experience.sql")
+
+        # A new user and one with experience written by someone else since the buffer has read it
+        await connection.execute('INSERT INTO "user_rank" ("guild_id", "user_id", "xp", "level", "total_xp") VALUES (1, 2, 50, 1, 150)')
+        await connection.execute(flush, [1, 1], [1, 2], [250, 0])
+        await connection.execute('UPDATE "user_rank" SET "total_xp" = "total_xp" + 1000 WHERE "user_id" = 1')
+        await connection.execute(flush, [1, 1], [1, 2], [30, 400])
+        rows = await connection.fetch('SELECT "user_id", "level", "xp", "total_xp" FROM "user_rank" ORDER BY "user_id"')
+        return [tuple(row.values()) for row in rows]
+    finally:
+        await connection.execute('DROP SCHEMA IF EXISTS "apollo_test" CASCADE')
+        await connection.close()
+
+def test_flush_keeps_the_level_consistent_with_the_total_experience(postgres_dsn:str):
+    rows = asyncio.run(flush_twice_around_a_recompute(postgres_dsn))
+    assert [(user_id, total_xp) for user_id, _, _, total_xp in rows] == [(1, 1280), (2, 550)]
+    for _, level, xp, total_xp in rows:
+        assert (level, xp) == split_total_xp(total_xp)
@@ -0,0 +1,52 @@
+import math
+import random
+import pytest
+from collections import Counter
+from typing import Callable
+from cogs.gamble.rules import Betflip_Rules, Betroll_Rules, Gamble_Rules, Slot_Rules, Wheel_Rules
+
+ALL_RULES = [Betflip_Rules(), Betroll_Rules(), Slot_Rules(), Wheel_Rules()]
+# Rounds simulated per game, run "python -m cogs.gamble.rules 100000000" from within src for the full benchmark
+SIMULATED_ROUNDS = 2_000_000
+# Allowed deviation of the simulated return to player, in standard errors of the mean
+TOLERANCE = 5
+
+def standard_error(rules:Gamble_Rules, rounds:int) -> float:
+    _, variance = rules.get_return_to_player()
+    return math.sqrt(variance / rounds)
+
+@pytest.mark.parametrize("rules", ALL_RULES, ids = lambda rules: rules.NAME)
+def test_simulated_return_to_player_matches_the_exact_one(rules:Gamble_Rules):
+    random.seed(14)
+    expected, variance = rules.get_return_to_player()
+    simulated, simulated_variance, _ = rules.simulate(SIMULATED_ROUNDS)
+    assert abs(simulated - expected) <= TOLERANCE * standard_error(rules, SIMULATED_ROUNDS)
+    assert simulated_variance == pytest.approx(variance, rel = 0.05)
+
+@pytest.mark.parametrize("rules", ALL_RULES, ids = lambda rules: rules.NAME)
+def test_outcome_weights_match_single_rounds(rules:Gamble_Rules):
+    # The exact return to player is calculated from the weights, so they have to match how `roll` plays a single round
+    random.seed(14)
+    rounds = 200_000
+    outcome_counts = Counter(rules.roll()[0] for _ in range(rounds))
+    played = sum(rules.PAYOUT_TABLE[outcome_class] * count for outcome_class, count in outcome_counts.items()) / rounds
+    expected, _ = rules.get_return_to_player()
+    assert abs(played - expected) <= TOLERANCE * standard_error(rules, rounds)
+
+def test_floored_payouts_lower_the_return_to_player():
+    # At the minimum bet of the wheel, 10 * 0.5 pays 5 but 10 * 0.1 only pays 1, every factor is already a whole amount
+    rules = Wheel_Rules()
+    assert rules.get_return_to_player(rules.MINIMUM_BET)[0] == pytest.approx(rules.get_return_to_player()[0])
+    assert rules.get_return_to_player(11)[0] < rules.get_return_to_player()[0]
+
+def test_known_return_to_player():
+    assert Betflip_Rules().get_return_to_player()[0] == pytest.approx(0.975)
+    assert Wheel_Rules().get_return_to_player()[0] == pytest.approx(7.9 / 8)
+    assert Slot_Rules().get_return_to_player()[0] == pytest.approx((30 + 5 * 10 + 15 * 4 + 75 * 1) / 216)
+
+@pytest.mark.parametrize("rules", ALL_RULES, ids = lambda rules: rules.NAME)
+def test_outcome_generation_throughput(rules:Gamble_Rules, throughput_baseline:Callable[[str, float], None]):
+    """Benchmark of `roll_many`, run with "APOLLO_BENCHMARK=1 python -m pytest -s tests/test_gamble_rules.py" to compare against the baseline"""
+    random.seed(14)
+    _, _, rounds_per_second = rules.simulate(SIMULATED_ROUNDS)
+    throughput_baseline(f"gamble.{rules.NAME}.rounds", rounds_per_second)
@@ -0,0 +1,56 @@
+import asyncio
+import os
+import random
+from time import perf_counter
+from conftest import load_sql_file
+
+# Benchmark of get_leaderboard_position, run with "APOLLO_TEST_DSN=... python -m pytest -s tests/test_rank_lookup_benchmark.py"
+# The user_rank table is grown step by step to the number of rows in APOLLO_BENCHMARK_ROWS, spread across APOLLO_BENCHMARK_GUILDS guilds
+SCHEMA = "apollo_benchmark"
+ROW_STEPS = [int(rows) for rows in os.environ.get("APOLLO_BENCHMARK_ROWS", "100000,1000000,3000000").split(",")]
+GUILDS = int(os.environ.get("APOLLO_BENCHMARK_GUILDS", "5000"))
+LOOKUPS = 1000
+# The median latency with the most rows may be at most this many times the one with the fewest rows
+MAX_SLOWDOWN = 3.0
+
+async def measure_rank_lookups(dsn:str) -> list[tuple[int, float, float]]:
+    """Returns the number of rows, the median and the 95th percentile latency (in seconds) of the rank lookup for every step"""
+    import asyncpg
+    connection:asyncpg.Connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute(f'DROP SCHEMA IF EXISTS "{SCHEMA}" CASCADE')
+        await connection.execute(f'CREATE SCHEMA "{SCHEMA}"')
+        await connection.execute(f'SET search_path TO "{SCHEMA}"')
+        await connection.execute(load_sql_file("ddl-user_rank.sql"))
+        await connection.execute(load_sql_file("idx-user_rank_guild_total_xp.sql"))
+        lookup = await connection.prepare(load_sql_file("query-get_leaderboard_position.sql"))
+
+        results = []
+        rows = 0
+        for target_rows in ROW_STEPS:
+            # Every guild gets the same share of the new users, their experience follows a long tail like on a real guild
+            await connection.execute("""
+                INSERT INTO "user_rank" ("guild_id", "user_id", "total_xp")
+                SELECT "user_id" % $3, "user_id", FLOOR(1000000 * POWER(RANDOM(), 4))::INTEGER
+                FROM GENERATE_SERIES($1::BIGINT, $2::BIGINT) AS "user_id"
+            """, rows, target_rows - 1, GUILDS)
+            await connection.execute('VACUUM ANALYZE "user_rank"')
+            rows = target_rows
+
+            latencies = []
+            for user_id in random.sample(range(rows), LOOKUPS):
+                begin = perf_counter()
+                await lookup.fetchval(user_id % GUILDS, user_id)
+                latencies.append(perf_counter() - begin)
+            latencies.sort()
+            results.append((rows, latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.95)]))
+        return results
+    finally:
+        await connection.execute(f'DROP SCHEMA IF EXISTS "{SCHEMA}" CASCADE')
+        await connection.close()
+
+def test_rank_lookup_latency_stays_flat(postgres_dsn:str):
+    results = asyncio.run(measure_rank_lookups(postgres_dsn))
+    for rows, median, percentile_95 in results:
+        print(f"{rows:>12,} rows across {GUILDS:,} guilds: median {median * 1000:.3f} ms, p95 {percentile_95 * 1000:.3f} ms")
+    assert results[-1][1] <= results[0][1] * MAX_SLOWDOWN
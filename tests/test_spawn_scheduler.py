@@ -0,0 +1,71 @@
+import math
+import random
+import pytest
+from utils.spawn_scheduler import Spawn_Scheduler
+
+NUMBER_OF_BINS = 20
+SPAWNS = 200_000
+# The fit is rejected below this p-value, with the fixed seed a correct distribution stays far above it
+SIGNIFICANCE = 0.001
+
+def roll_gap(probability:int) -> int:
+    """Number of messages until the next spawn, when rolling a chance of 1 in `probability` on every message like before the scheduler"""
+    gap = 1
+    while random.randint(1, probability) != 1:
+        gap += 1
+    return gap
+
+def chi_square(gaps:list[int], probability:int) -> tuple[float, float]:
+    """Returns the chi-square statistic of the gaps against the exact geometric distribution and its p-value (Wilson-Hilferty approximation)
+
+    The gaps are put into bins of roughly equal expected count, the last one is open ended"""
+    def cdf(gap:int) -> float:
+        return 1 - (1 - 1 / probability) ** gap
+
+    edges = sorted({math.ceil(math.log(1 - i / NUMBER_OF_BINS) / math.log1p(-1 / probability)) for i in range(1, NUMBER_OF_BINS)})
+    expected = [cdf(upper) - cdf(lower) for lower, upper in zip([0] + edges, edges)] + [1 - cdf(edges[-1])]
+    observed = [0] * len(expected)
+    for gap in gaps:
+        observed[next((index for index, edge in enumerate(edges) if gap <= edge), len(edges))] += 1
+
+    statistic = sum((count - share * len(gaps)) ** 2 / (share * len(gaps)) for count, share in zip(observed, expected))
+    degrees = len(expected) - 1
+    z = ((statistic / degrees) ** (1 / 3) - (1 - 2 / (9 * degrees))) / math.sqrt(2 / (9 * degrees))
+    return statistic, 0.5 * math.erfc(z / math.sqrt(2))
+
+@pytest.mark.parametrize("probability", [2, 10, 100])
+def test_gaps_match_rolling_on_every_message(probability:int):
+    random.seed(25)
+    _, p_value = chi_square([Spawn_Scheduler.draw_gap(probability) for _ in range(SPAWNS)], probability)
+    assert p_value > SIGNIFICANCE
+    # The previous behaviour is held to the same distribution, so the test would notice if the reference itself was off
+    _, p_value = chi_square([roll_gap(probability) for _ in range(SPAWNS // 10)], probability)
+    assert p_value > SIGNIFICANCE
+
+def test_chi_square_rejects_a_wrong_distribution():
+    random.seed(25)
+    # Spawning twice as often has to be detected
+    _, p_value = chi_square([Spawn_Scheduler.draw_gap(50) for _ in range(SPAWNS)], 100)
+    assert p_value < SIGNIFICANCE
+
+def test_spawn_rate_per_message():
+    random.seed(25)
+    scheduler = Spawn_Scheduler()
+    messages = 1_000_000
+    spawns = sum(scheduler.tick(1, 100) for _ in range(messages))
+    # Binomial with a standard deviation of about 99.5 spawns
+    assert abs(spawns - messages / 100) < 5 * math.sqrt(messages * 0.01 * 0.99)
+
+def test_every_message_spawns_with_a_probability_of_one():
+    scheduler = Spawn_Scheduler()
+    assert all(scheduler.tick(1, 1) for _ in range(100))
+    assert Spawn_Scheduler.draw_gap(0) == 1
+
+def test_changed_probability_draws_a_new_countdown():
+    random.seed(25)
+    scheduler = Spawn_Scheduler()
+    scheduler.tick(1, 10 ** 9)
+    # The countdown drawn for a chance of one in a billion is not kept once spawns happen on every message
+    assert scheduler.tick(1, 1)
+    scheduler.forget(1)
+    scheduler.forget(2)
@@ -0,0 +1,60 @@
+import asyncio
+import pytest
+from utils.work_queue import Fair_Work_Queue
+
+def test_size_and_workers_have_to_be_positive():
+    async def handler(item):
+        pass
+    with pytest.raises(ValueError):
+        Fair_Work_Queue(handler, max_size = 0)
+    with pytest.raises(ValueError):
+        Fair_Work_Queue(handler, workers = 0)
+
+def test_guilds_take_turns():
+    async def run() -> list[tuple[int, int]]:
+        handled = []
+        async def handler(item:tuple[int, int]):
+            handled.append(item)
+        queue = Fair_Work_Queue(handler, workers = 1)
+        for number in range(3):
+            queue.put(1, (1, number))
+        queue.put(2, (2, 0))
+        queue.start()
+        await asyncio.sleep(0.01)
+        await queue.stop()
+        return handled
+    assert asyncio.run(run()) == [(1, 0), (2, 0), (1, 1), (1, 2)]
+
+def test_full_queue_drops_low_value_items_first():
+    async def run() -> tuple[int, int, int, int, int, int]:
+        async def handler(item):
+            pass
+        queue = Fair_Work_Queue(handler, max_size = 2)
+        assert queue.put(1, "first")
+        assert queue.put(1, "low value", low_value = True)
+        # A low value item is not queued into a full queue, another item replaces the queued low value one
+        assert not queue.put(2, "another low value", low_value = True)
+        assert queue.put(2, "second")
+        return queue.get_statistics()
+    depth, _, _, processed, dropped_low_value, dropped = asyncio.run(run())
+    assert (depth, processed, dropped_low_value, dropped) == (2, 0, 2, 0)
+
+def test_stop_cancels_the_items_being_handled():
+    async def run() -> list[str]:
+        events = []
+        async def handler(item:str):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                events.append(f"{item} cancelled")
+                raise
+        queue = Fair_Work_Queue(handler, workers = 2)
+        queue.start()
+        queue.put(1, "first")
+        queue.put(2, "second")
+        queue.put(3, "queued")
+        await asyncio.sleep(0.01)
+        await queue.stop()
+        events.append(f"stopped with {queue.depth} queued")
+        return events
+    assert asyncio.run(run()) == ["first cancelled", "second cancelled", "stopped with 0 queued"]